@@ -0,0 +1,110 @@
+"""
+Comprobación de regresión de la exportación MIDI por voces.
+
+Compara, para partituras del corpus de music21 con repeticiones, el
+instante en que termina la última nota de cada voz exportada por
+export_selected_parts_to_midi con el de la exportación MIDI de
+music21 (que despliega las repeticiones).
+
+Uso (desde la raíz del repositorio):
+
+    python scripts/check_midi_export.py
+
+Devuelve código 1 si alguna voz no coincide.
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+import mido
+from music21 import corpus, midi, stream
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from services.coral_parser_service import analyze_coral_parts  # noqa: E402
+from services.coral_midi_service import export_selected_parts_to_midi  # noqa: E402
+
+# Corales con barras de repetición
+WORKS = ["bach/bwv103.6", "bach/bwv11.6"]
+
+TOLERANCE_SECONDS = 0.05
+
+
+# ==========================================================
+#   UTILIDADES
+# ==========================================================
+
+def last_note_end(midi_path: Path) -> float:
+    """
+    Segundos hasta el último note_off (sin el relleno final que
+    music21 añade antes del end_of_track).
+    """
+
+    elapsed = 0.0
+    last_end = 0.0
+
+    for msg in mido.MidiFile(midi_path):
+
+        elapsed += msg.time
+
+        if msg.type == "note_off" or (msg.type == "note_on" and msg.velocity == 0):
+            last_end = elapsed
+
+    return last_end
+
+
+def music21_part_midi(part, midi_path: Path):
+
+    mf = midi.translate.streamToMidiFile(stream.Score([part.__deepcopy__()]))
+    mf.open(str(midi_path), "wb")
+    mf.write()
+    mf.close()
+
+
+# ==========================================================
+#   COMPROBACIÓN
+# ==========================================================
+
+def check_work(work: str, output_dir: Path) -> bool:
+
+    xml_path = Path(corpus.getWork(work))
+    score = corpus.parse(work)
+
+    parts = analyze_coral_parts(xml_path)["parts"]
+
+    selected = [
+        {"id": f"{part['id']}_{row}", "name": f"voz_{row}"}
+        for row, part in enumerate(parts)
+    ]
+
+    exported = export_selected_parts_to_midi(xml_path, selected, output_dir, workers=1)
+
+    ok = True
+
+    for part, midi_path in zip(score.parts, exported):
+
+        reference_path = output_dir / f"music21_{midi_path.name}"
+        music21_part_midi(part, reference_path)
+
+        expected = last_note_end(reference_path)
+        actual = last_note_end(midi_path)
+
+        status = "OK" if abs(expected - actual) <= TOLERANCE_SECONDS else "FALLO"
+        ok = ok and status == "OK"
+
+        print(f"{status:5} {work} {midi_path.stem}: music21 {expected:.2f} s, exportado {actual:.2f} s")
+
+    return ok
+
+
+def main() -> int:
+
+    with tempfile.TemporaryDirectory(prefix="midi_check_") as tmp:
+        results = [check_work(work, Path(tmp) / work.replace("/", "_")) for work in WORKS]
+
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
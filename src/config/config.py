@@ -1,4 +1,5 @@
 # src/config.py
+import os
 from pathlib import Path
 import platform
 
@@ -14,3 +15,49 @@ MUSESCORE_PATH: Path = Path(r"C:\Program Files\MuseScore 4\bin\MuseScore4.exe")
 
 # Ruta a Poppler (necesario para convertir PDF a imagen en Windows)
 POPPLER_PATH = Path(r"C:\Release-25.12.0-0\poppler-25.12.0\Library\bin")
+
+# Carpeta de cachés persistentes de la aplicación
+CACHE_DIR: Path = Path.home() / ".cache" / "musictosound"
+
+# Caché en memoria de partituras parseadas con music21
+# (número máximo de partituras y memoria estimada máxima en MB)
+SCORE_CACHE_MAX_ENTRIES: int = 4
+SCORE_CACHE_MAX_MB: int = 512
+
+# MusicXML descomprimidos de los .mxl (en memoria, por sesión)
+MXL_CACHE_MAX_MB: int = 128
+
+# Caché en disco de partituras parseadas (se conserva entre sesiones)
+SCORE_DISK_CACHE_DIR: Path = CACHE_DIR / "scores"
+SCORE_DISK_CACHE_MAX_MB: int = 1024
+
+# Caché en disco de MIDI/WAV ya exportados (por variante de exportación)
+EXPORT_CACHE_DIR: Path = CACHE_DIR / "exports"
+EXPORT_CACHE_MAX_MB: int = 2048
+
+# Curva de F0 de las voces cantadas
+F0_FRAME_RATE: int = 100            # frames por segundo
+F0_PORTAMENTO_SECONDS: float = 0.05
+F0_VIBRATO_DEPTH: float = 0.25      # semitonos
+F0_VIBRATO_RATE: float = 5.5        # Hz
+F0_VIBRATO_DELAY: float = 0.25      # segundos
+
+# eSpeak para la conversión a fonemas
+ESPEAK_PATH: Path = Path(r"C:\Program Files (x86)\eSpeak\command_line\espeak.exe")
+
+# Biblioteca de eSpeak NG (si no se encuentra se usa el ejecutable)
+ESPEAK_LIBRARY_PATH: Path = Path(r"C:\Program Files\eSpeak NG\libespeak-ng.dll")
+
+# Procesos que mantiene vivos el pool de fonemización (por idioma)
+PHONEMIZER_WORKERS: int = max(1, min(4, (os.cpu_count() or 2) - 1))
+
+# Caché de fonemas (memoria + SQLite en disco)
+PHONEME_CACHE_PATH: Path = CACHE_DIR / "phonemes.sqlite"
+PHONEME_CACHE_MAX_ENTRIES: int = 50000
+
+# Procesos para exportar voces a MIDI en paralelo (1 = secuencial)
+MIDI_EXPORT_WORKERS: int = max(1, min(4, (os.cpu_count() or 2) - 1))
+
+# Perfiles de tonalidad para la detección de tonalidad
+# ("aarden" como music21, "krumhansl" o "temperley")
+KEY_DETECTION_PROFILE: str = "aarden"
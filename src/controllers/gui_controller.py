@@ -352,7 +352,7 @@ def run_coral_gui():
         log("Análisis completado correctamente.")
         log(f"Título: {result['title']}")
         log(f"Tempo detectado: {result['tempo']} BPM")
-        log(f"Tonalidad detectada: {result['key']}")
+        log(f"Tonalidad detectada: {result['key']} (confianza {result['key_confidence']:.2f})")
 
         set_original_tempo(result["tempo"])
         set_initial_key(result["key"])
@@ -431,6 +431,7 @@ def run_coral_gui():
             voice_models=voice_models,
             language=language,
             output_dir=current_output_dir,
+            tempo_bpm=get_final_tempo(),
             log=log
         )
 
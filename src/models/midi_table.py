@@ -0,0 +1,38 @@
+# src/models/midi_table.py
+"""
+Tabla compacta de una parte para escribir MIDI.
+
+Contiene lo necesario para emitir el archivo sin volver a recorrer
+music21: notas (ya unidas las ligaduras y con todas las alturas de
+los acordes), letra, armaduras, compases e instrumento.
+"""
+
+from dataclasses import dataclass, field
+
+import numpy as np
+
+MIDI_NOTE_DTYPE = np.dtype([
+    ("pitch", np.int16),       # altura MIDI
+    ("onset", np.float64),     # offset absoluto en quarterLength
+    ("duration", np.float64),  # duración en quarterLength
+    ("velocity", np.int16),    # 1-127
+])
+
+
+@dataclass
+class MidiPartTable:
+    """
+    lyrics          → [(offset, texto)] de la primera letra de cada nota
+    key_signatures  → [(offset, sostenidos, modo)] (bemoles en negativo)
+    time_signatures → [(offset, numerador, denominador)]
+    program         → programa General MIDI (0-127) o None
+    """
+    name: str
+    notes: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=MIDI_NOTE_DTYPE))
+    lyrics: list[tuple[float, str]] = field(default_factory=list)
+    key_signatures: list[tuple[float, int, str | None]] = field(default_factory=list)
+    time_signatures: list[tuple[float, int, int]] = field(default_factory=list)
+    program: int | None = None
+
+    def __len__(self) -> int:
+        return len(self.notes)
@@ -0,0 +1,101 @@
+# src/models/midi_transform.py
+"""
+Transformaciones perezosas de la exportación MIDI.
+
+En lugar de transponer el score de music21 y copiar cada parte para
+cambiarle la altura o la velocidad, las tablas MIDI de la partitura
+se comparten (solo lectura) y cada exportación lleva una
+MidiTransform: una descripción inmutable de los cambios que se
+aplican a los eventos al emitirlos.
+
+    MidiTransform()
+        .with_tempo(90)          → tempo final (cambios escalados)
+        .transpose(2)            → transposición global
+        .transpose(-1)           → ajuste de altura de la voz
+        .scale_velocity(0.8)     → volumen de la voz en la mezcla
+
+Cada paso devuelve una transformación nueva, de modo que la global
+se puede reutilizar para todas las voces sin copiar nada.
+"""
+
+from dataclasses import dataclass, replace
+
+import numpy as np
+
+# Alteraciones que se suman a la armadura al transponer n semitonos
+# (n módulo 12), igual que KeySignature.transpose de music21
+_FIFTHS_BY_SEMITONE = [0, 7, 2, -3, 4, -1, 6, 1, 8, 3, -2, 5]
+
+
+def transpose_key_signature(sharps: int, semitones: int) -> int:
+    """
+    Armadura tras transponer, normalizada a ±7 alteraciones.
+    """
+
+    sharps += _FIFTHS_BY_SEMITONE[semitones % 12]
+
+    while sharps > 7:
+        sharps -= 12
+    while sharps < -7:
+        sharps += 12
+
+    return sharps
+
+
+@dataclass(frozen=True)
+class MidiTransform:
+    """
+    transpositions → semitonos, en el orden en que se aplican
+    velocity_scale → factor sobre la velocidad de cada nota
+    tempo_bpm      → tempo inicial elegido (None = el de la partitura)
+    """
+    transpositions: tuple[int, ...] = ()
+    velocity_scale: float = 1.0
+    tempo_bpm: float | None = None
+
+    # ------------------------------------------------------
+    # Composición
+    # ------------------------------------------------------
+    def transpose(self, semitones: int) -> "MidiTransform":
+
+        if not semitones:
+            return self
+
+        return replace(self, transpositions=self.transpositions + (int(semitones),))
+
+    def scale_velocity(self, factor: float) -> "MidiTransform":
+
+        if factor == 1.0:
+            return self
+
+        return replace(self, velocity_scale=self.velocity_scale * float(factor))
+
+    def with_tempo(self, bpm: float | None) -> "MidiTransform":
+        return replace(self, tempo_bpm=bpm or None)
+
+    @property
+    def semitones(self) -> int:
+        return sum(self.transpositions)
+
+    # ------------------------------------------------------
+    # Aplicación (al emitir los eventos)
+    # ------------------------------------------------------
+    def pitches(self, pitches: np.ndarray) -> np.ndarray:
+        return np.clip(pitches.astype(np.int64) + self.semitones, 0, 127)
+
+    def velocities(self, velocities: np.ndarray) -> np.ndarray:
+        return np.clip(np.rint(velocities * self.velocity_scale), 1, 127).astype(np.int64)
+
+    def key_signature(self, sharps: int) -> int:
+        """
+        Armadura transpuesta paso a paso (primero la partitura y
+        después la voz, como hacía music21).
+        """
+
+        for semitones in self.transpositions:
+            sharps = transpose_key_signature(sharps, semitones)
+
+        return sharps
+
+    def tempo_map(self, tempo_map):
+        return tempo_map.with_override(self.tempo_bpm)
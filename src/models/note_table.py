@@ -0,0 +1,145 @@
+# src/models/note_table.py
+"""
+Tabla columnar de notas de una voz.
+
+Sustituye a las listas de diccionarios {"pitch", "duration", "offset"}:
+cada nota ocupa una fila de un array estructurado de NumPy, de modo que
+las conversiones de tiempo y de frames se hacen con operaciones de array.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+# Valor de "pitch" para notas sin altura (percusión, etc.)
+NO_PITCH = -1
+
+NOTE_DTYPE = np.dtype([
+    ("pitch", np.int16),       # altura MIDI o NO_PITCH
+    ("onset", np.float64),     # offset absoluto en quarterLength
+    ("duration", np.float64),  # duración en quarterLength
+    ("measure", np.int32),     # número de compás (-1 si se desconoce)
+])
+
+
+class NoteTable:
+
+    __slots__ = ("data",)
+
+    def __init__(self, data: np.ndarray | None = None):
+
+        if data is None:
+            data = np.empty(0, dtype=NOTE_DTYPE)
+
+        self.data = data
+
+    @classmethod
+    def from_rows(cls, rows) -> "NoteTable":
+        """
+        Construye la tabla a partir de filas con atributos
+        pitch, onset, duration y measure (p. ej. NoteRow).
+        """
+
+        records = [
+            (
+                NO_PITCH if row.pitch is None else row.pitch,
+                row.onset,
+                row.duration,
+                -1 if row.measure is None else row.measure,
+            )
+            for row in rows
+        ]
+
+        return cls(np.array(records, dtype=NOTE_DTYPE))
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __getitem__(self, item) -> "NoteTable":
+        return NoteTable(self.data[item])
+
+    # ------------------------------------------------------
+    # Columnas
+    # ------------------------------------------------------
+    @property
+    def pitch(self) -> np.ndarray:
+        return self.data["pitch"]
+
+    @property
+    def onset(self) -> np.ndarray:
+        return self.data["onset"]
+
+    @property
+    def duration(self) -> np.ndarray:
+        return self.data["duration"]
+
+    @property
+    def measure(self) -> np.ndarray:
+        return self.data["measure"]
+
+    @property
+    def has_pitch(self) -> np.ndarray:
+        return self.data["pitch"] != NO_PITCH
+
+    @property
+    def end(self) -> np.ndarray:
+        return self.data["onset"] + self.data["duration"]
+
+    # ------------------------------------------------------
+    # Conversiones vectorizadas
+    # ------------------------------------------------------
+    def seconds(self, tempo_map) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Inicio y fin de cada nota en segundos absolutos.
+        """
+
+        return tempo_map.to_seconds(self.onset), tempo_map.to_seconds(self.end)
+
+
+@dataclass
+class AlignedVoice:
+    """
+    Notas de una voz emparejadas con sus sílabas y fonemas.
+
+    starts / ends son los tiempos de cada nota en segundos absolutos
+    (ya aplicado el mapa de tempo), compartidos por los generadores
+    de .lab, F0 y singing_score.json.
+    """
+    notes: NoteTable
+    syllables: list[str]
+    phonemes: list[list[str]]
+    starts: np.ndarray
+    ends: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.notes)
+
+    def to_dicts(self) -> list[dict]:
+        """
+        Representación serializable (singing_score.json).
+        """
+
+        pitches = self.notes.pitch.tolist()
+        durations = self.notes.duration.tolist()
+        offsets = self.notes.onset.tolist()
+
+        return [
+            {
+                "syllable": syllable,
+                "phonemes": phonemes,
+                "pitch": None if pitch == NO_PITCH else pitch,
+                "duration": duration,
+                "offset": offset,
+                "start": start,
+                "end": end,
+            }
+            for syllable, phonemes, pitch, duration, offset, start, end in zip(
+                self.syllables,
+                self.phonemes,
+                pitches,
+                durations,
+                offsets,
+                self.starts.tolist(),
+                self.ends.tolist(),
+            )
+        ]
@@ -0,0 +1,108 @@
+# src/models/tempo_map.py
+"""
+Mapa de tempo precalculado: convierte offsets en quarterLength
+a segundos absolutos.
+
+Se construye una vez por partitura a partir de
+score.metronomeMarkBoundaries() y después cada conversión es una
+búsqueda binaria (np.searchsorted) sobre los tramos de tempo.
+"""
+
+import numpy as np
+
+DEFAULT_BPM = 120.0
+
+
+class TempoMap:
+
+    __slots__ = ("starts", "bpms", "start_seconds")
+
+    def __init__(self, starts, bpms):
+        """
+        starts → offset (quarterLength) donde empieza cada tramo, ordenados
+        bpms   → negras por minuto de cada tramo
+        """
+
+        self.starts = np.asarray(starts, dtype=np.float64)
+        self.bpms = np.asarray(bpms, dtype=np.float64)
+
+        if len(self.starts) == 0 or self.starts[0] > 0:
+            self.starts = np.concatenate(([0.0], self.starts))
+            first_bpm = self.bpms[0] if len(self.bpms) else DEFAULT_BPM
+            self.bpms = np.concatenate(([first_bpm], self.bpms))
+
+        # segundos acumulados al inicio de cada tramo
+        seconds_per_quarter = 60.0 / self.bpms
+        lengths = np.diff(self.starts) * seconds_per_quarter[:-1]
+
+        self.start_seconds = np.concatenate(([0.0], np.cumsum(lengths)))
+
+    @classmethod
+    def constant(cls, bpm: float) -> "TempoMap":
+        return cls([0.0], [float(bpm)])
+
+    @classmethod
+    def from_boundaries(cls, boundaries) -> "TempoMap":
+        """
+        boundaries: lista (inicio, fin, MetronomeMark) como la que
+        devuelve score.metronomeMarkBoundaries().
+        """
+
+        starts = []
+        bpms = []
+
+        for start, end, mark in boundaries:
+
+            # music21 devuelve tramos vacíos cuando varias partes
+            # repiten la misma marca en el mismo offset
+            if end <= start:
+                continue
+
+            bpm = mark.getQuarterBPM() if mark is not None else None
+
+            if not bpm:
+                continue
+
+            if bpms and bpms[-1] == bpm:
+                continue
+
+            starts.append(float(start))
+            bpms.append(float(bpm))
+
+        if not starts:
+            return cls.constant(DEFAULT_BPM)
+
+        return cls(starts, bpms)
+
+    def with_override(self, bpm: float | None) -> "TempoMap":
+        """
+        Aplica el tempo elegido por el usuario (el "Final" de la vista
+        coral). El tempo inicial pasa a ser bpm y el resto de cambios de
+        tempo se escalan en la misma proporción.
+        """
+
+        if not bpm:
+            return self
+
+        ratio = float(bpm) / self.initial_bpm
+
+        return TempoMap(self.starts, self.bpms * ratio)
+
+    @property
+    def initial_bpm(self) -> float:
+        return float(self.bpms[0])
+
+    def to_seconds(self, offsets) -> np.ndarray:
+        """
+        Convierte offsets absolutos (quarterLength) a segundos.
+        """
+
+        offsets = np.asarray(offsets, dtype=np.float64)
+
+        segment = np.searchsorted(self.starts, offsets, side="right") - 1
+        segment = np.clip(segment, 0, len(self.starts) - 1)
+
+        return (
+            self.start_seconds[segment]
+            + (offsets - self.starts[segment]) * 60.0 / self.bpms[segment]
+        )
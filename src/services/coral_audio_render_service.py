@@ -2,6 +2,8 @@ from pathlib import Path
 import subprocess
 import shutil
 
+from services.export_cache_service import rendered_key, fetch, store
+
 def find_musescore():
     """
     Busca el ejecutable de MuseScore en el sistema.
@@ -30,6 +32,9 @@ def find_musescore():
 def midi_to_wav(midi_path: Path, wav_path: Path):
     """
     Convierte un archivo MIDI a WAV usando MuseScore.
+
+    Si ese mismo MIDI ya se convirtió, el WAV se copia
+    desde la caché de exportaciones.
     """
 
     musescore = find_musescore()
@@ -39,6 +44,11 @@ def midi_to_wav(midi_path: Path, wav_path: Path):
             "No se encontró MuseScore en el sistema. Instálalo o añádelo al PATH."
         )
 
+    cache_key = rendered_key("wav", midi_path, renderer=musescore)
+
+    if fetch(cache_key, wav_path):
+        return
+
     cmd = [
         musescore,
         str(midi_path),
@@ -46,4 +56,6 @@ def midi_to_wav(midi_path: Path, wav_path: Path):
         str(wav_path)
     ]
 
-    subprocess.run(cmd, check=True)
\ No newline at end of file
+    subprocess.run(cmd, check=True)
+
+    store(cache_key, wav_path)
\ No newline at end of file
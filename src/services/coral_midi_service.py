@@ -2,112 +2,201 @@
 Servicio encargado de generar archivos MIDI
 a partir de partes individuales.
 """
-from music21 import converter
 from pathlib import Path
-from music21 import stream
-from music21 import tempo
-import copy
 
-import mido
+import numpy as np
+from music21 import chord
+from music21 import key as m21_key
+from music21 import meter
+from music21 import note as m21_note
+from music21 import volume as m21_volume
+from music21 import instrument as m21_instrument
+from music21 import repeat
+
+from config.config import MIDI_EXPORT_WORKERS
+from services.score_repository_service import get_derived
+from services.coral_parser_service import get_score_index
+from services.midi_writer_service import write_mix_midi
+from services.midi_export_pool import write_parts
+from services.export_cache_service import export_key, fetch, store
+from models.midi_table import MIDI_NOTE_DTYPE, MidiPartTable
+from models.midi_transform import MidiTransform
+from models.tempo_map import TempoMap
+
+# ==========================================================
+# Construcción de las tablas (un recorrido por parte)
+# ==========================================================
+def build_midi_table(part, name: str) -> MidiPartTable:
+    """
+    Recorre la parte una vez y devuelve su MidiPartTable.
+
+    Las notas ligadas se unen en una sola (como stripTies al exportar
+    con music21) y la velocidad es la realizada por music21
+    (dinámicas incluidas).
+    """
+
+    table = MidiPartTable(name=name)
+
+    # calcula volume.cachedRealized de cada nota según las dinámicas
+    m21_volume.realizeVolume(part)
+
+    notes = []
+    open_ties = {}
+
+    iterator = part.recurse()
+
+    for el in iterator:
 
-def insert_lyrics_into_midi(midi_path: Path, part):
+        if isinstance(el, m21_key.KeySignature):
+            mode = getattr(el, "mode", None)
+            table.key_signatures.append((float(iterator.currentHierarchyOffset()), el.sharps, mode))
+            continue
+
+        if isinstance(el, meter.TimeSignature):
+            table.time_signatures.append((float(iterator.currentHierarchyOffset()), el.numerator, el.denominator))
+            continue
+
+        if isinstance(el, m21_instrument.Instrument):
+            if table.program is None and el.midiProgram is not None:
+                table.program = el.midiProgram
+            continue
+
+        if not isinstance(el, m21_note.NotRest) or isinstance(el, m21_note.Unpitched):
+            continue
 
-    mid = mido.MidiFile(midi_path)
-    track = mid.tracks[0]
+        onset = float(iterator.currentHierarchyOffset())
+        duration = float(el.quarterLength)
 
-    ticks_per_beat = mid.ticks_per_beat
+        if duration <= 0:
+            continue  # notas de adorno
 
-    events = []
-    abs_time = 0
+        if el.lyrics and el.lyrics[0].text:
+            table.lyrics.append((onset, el.lyrics[0].text))
 
-    # convertir eventos existentes a tiempo absoluto
-    for msg in track:
-        abs_time += msg.time
-        events.append((abs_time, msg))
+        velocity = _velocity(el.volume)
 
-    # añadir lyrics
-    for note in part.recurse().notes:
-        if note.lyrics:
+        components = el.notes if isinstance(el, chord.Chord) else (el,)
 
-            lyric_text = clean_lyric(note.lyrics[0].text)
+        for component in components:
 
-            #tick = int(note.offset * ticks_per_beat)
-            abs_offset = note.getOffsetInHierarchy(part)
-            tick = int(abs_offset * ticks_per_beat)
+            pitch = component.pitch.midi
+            tie = (component.tie or el.tie)
+            tie_type = tie.type if tie is not None else None
 
-            lyric_msg = mido.MetaMessage(
-                "lyrics",
-                text=lyric_text,
-                time=0
-            )
+            # continuación de una nota ligada: se alarga la original
+            if tie_type in ("stop", "continue") and pitch in open_ties:
 
-            events.append((tick, lyric_msg))
+                start_index = open_ties[pitch]
+                notes[start_index][2] = onset + duration - notes[start_index][1]
 
-    # ordenar todos los eventos por tiempo
-    events.sort(key=lambda x: x[0])
+                if tie_type == "stop":
+                    del open_ties[pitch]
 
-    # reconstruir track con delta-times correctos
-    new_track = mido.MidiTrack()
+                continue
 
-    last_time = 0
+            notes.append([pitch, onset, duration, velocity])
 
-    for abs_time, msg in events:
+            if tie_type == "start":
+                open_ties[pitch] = len(notes) - 1
 
-        delta = abs_time - last_time
+    table.notes = np.array([tuple(n) for n in notes], dtype=MIDI_NOTE_DTYPE)
 
-        msg.time = delta
+    return table
 
-        new_track.append(msg)
 
-        last_time = abs_time
+def _velocity(vol) -> int:
 
-    mid.tracks[0] = new_track
+    realized = vol.cachedRealized
 
-    mid.save(midi_path)
+    if realized is None:
+        realized = vol.getRealized()
 
-def clean_lyric(text: str) -> str:
+    return max(1, min(127, int(round(realized * 127))))
+
+
+def build_midi_tables(score, names: list[str]) -> list[MidiPartTable]:
+    """
+    Tablas de todas las partes de score.parts, en el mismo orden.
+    """
+
+    return [
+        build_midi_table(part, name)
+        for part, name in zip(score.parts, names)
+    ]
+
+
+def _expand_repeats(score):
     """
-    Limpia caracteres problemáticos para MIDI (latin-1).
+    Score con las repeticiones desplegadas, como hace music21 al
+    exportar a MIDI. Si las marcas de repetición no se pueden
+    desplegar se usa la partitura tal cual.
     """
 
-    replacements = {
-        "“": '"',
-        "”": '"',
-        "‘": "'",
-        "’": "'",
-        "…": "...",
-        "¿": "",
-        "¡": "",
-    }
+    try:
+        return score.expandRepeats()
+    except repeat.ExpanderException:
+        return score
 
-    for bad, good in replacements.items():
-        text = text.replace(bad, good)
 
-    return text
+def build_midi_score(score, names: list[str], default_bpm: float) -> tuple[list[MidiPartTable], TempoMap]:
+    """
+    Tablas de todas las partes y mapa de tempo, ambos sobre la
+    partitura con las repeticiones desplegadas.
+    """
+
+    expanded = _expand_repeats(score)
+
+    try:
+        tempo_map = TempoMap.from_boundaries(expanded.metronomeMarkBoundaries())
+    except Exception:
+        tempo_map = TempoMap.constant(default_bpm)
 
-def apply_tempo(score, bpm: int):
+    return build_midi_tables(expanded, names), tempo_map
+
+
+def get_midi_tables(xml_path: Path) -> tuple[list[MidiPartTable], TempoMap]:
     """
-    Aplica un tempo global al score y a cada parte.
+    Tablas MIDI de todas las partes (en el orden de score.parts) y su
+    mapa de tempo, construidos una vez por archivo y sesión.
+
+    Las repeticiones se despliegan (como en la exportación MIDI de
+    music21), así que los offsets no coinciden con los del índice.
     """
 
-    tempo_mark = tempo.MetronomeMark(number=bpm)
+    index = get_score_index(xml_path)
+    names = [part.name for part in index.parts]
 
-    # eliminar tempos existentes
-    for el in score.recurse().getElementsByClass(tempo.MetronomeMark):
-        if el.activeSite:
-            el.activeSite.remove(el)
+    return get_derived(
+        xml_path,
+        "midi_tables",
+        lambda score: build_midi_score(score, names, index.tempo),
+    )
 
-    # insertar en score
-    score.insert(0, tempo_mark)
 
-    # insertar en cada parte
-    for part in score.parts:
-        part.insert(0, tempo.MetronomeMark(number=bpm))
+def _midi_file_name(display_name: str, tempo_bpm: int | None, final_key: str | None) -> str:
+
+    safe_name = (
+        display_name
+        .strip()
+        .replace(" ", "_")
+        .replace("/", "_")
+        .replace("\\", "_")
+    )
+
+    key_suffix = ""
+    if final_key:
+        key_suffix = "_" + final_key.replace(" ", "")
+
+    if tempo_bpm:
+        return f"{safe_name}_{tempo_bpm}bpm{key_suffix}.mid"
+
+    return f"{safe_name}{key_suffix}.mid"
 
-    return score
 
 """ 
 Genera un archivo MIDI por cada parte seleccionada. 
+workers: procesos de escritura (None = MIDI_EXPORT_WORKERS, 1 = secuencial).
+Las variantes ya exportadas se copian desde la caché de exportaciones.
 Returns: archivos MIDI generados. 
 """
 def export_selected_parts_to_midi(
@@ -118,100 +207,63 @@ def export_selected_parts_to_midi(
     transpose: int = 0,
     pitch_levels: dict | None = None,
     final_key: str | None = None,
-    
+    workers: int | None = None,
 ) -> list[Path]:
 
-    score = converter.parse(xml_path)
-
-    # aplicar transposición global
-    if transpose != 0:
-        score = score.transpose(transpose)
+    # Las voces se escriben directamente desde las tablas MIDI de la
+    # partitura: sin copiar partes ni transponer el score de music21.
+    # Tempo y transposición se aplican al emitir los eventos.
+    index = get_score_index(xml_path)
+    tables, tempo_map = get_midi_tables(xml_path)
 
-        # normalizar KeySignature para evitar >7 sostenidos o bemoles
-        for ks in score.recurse().getElementsByClass("KeySignature"):
-            while ks.sharps > 7:
-                ks.sharps -= 12
-            while ks.sharps < -7:
-                ks.sharps += 12
-    
-    if tempo_bpm:
-        score = apply_tempo(score, tempo_bpm)
+    transform = MidiTransform().with_tempo(tempo_bpm).transpose(transpose)
 
     output_dir.mkdir(parents=True, exist_ok=True)
 
-    generated_files = []
+    midi_files = []
+    jobs = []
+    job_keys = []
 
-    # Convertimos a diccionario para lookup rápido
-    #selected_map = {p["id"]: p["name"] for p in selected_parts}
-    selected_map = {}
+    for selected in selected_parts:
 
-    for p in selected_parts:
-        real_id = p["id"].split("_")[0]   # 🔥 clave
-        selected_map.setdefault(real_id, []).append(p["name"])
-        
-    part_counter = {}    
-    for part in score.parts:
+        # localizar la parte por su posición en la partitura
+        part_info = index.find_part(selected["id"])
 
-        #if part.id in selected_map:
-            #display_name = selected_map[part.id]
-        
-        if part.id in selected_map:
+        if part_info is None:
+            continue  # seguridad
 
-            names = selected_map[part.id]
+        table = tables[part_info.position - 1]
 
-            # índice basado en cuántas veces hemos visto esta part
-            count = part_counter.get(part.id, 0)
+        midi_path = output_dir / _midi_file_name(selected["name"], tempo_bpm, final_key)
+        midi_files.append(midi_path)
 
-            if count >= len(names):
-                continue  # seguridad
+        pitch_shift = pitch_levels.get(selected["id"], 0) if pitch_levels else 0
 
-            display_name = names[count]
+        cache_key = export_key(
+            "part_midi",
+            xml_path,
+            part=selected["id"],
+            tempo=tempo_bpm,
+            transpose=transpose,
+            pitch=pitch_shift,
+            final_key=final_key,
+            volume=1.0,
+        )
 
-            part_counter[part.id] = count + 1
-
-
-            safe_name = (
-                display_name
-                .strip()
-                .replace(" ", "_")
-                .replace("/", "_")
-                .replace("\\", "_")
-            )
-
-            key_suffix = ""
-            if final_key:
-                key_suffix = "_" + final_key.replace(" ", "")
-
-            if tempo_bpm:
-                midi_path = output_dir / f"{safe_name}_{tempo_bpm}bpm{key_suffix}.mid"
-            else:
-                midi_path = output_dir / f"{safe_name}{key_suffix}.mid"
-       
-            part_copy = copy.deepcopy(part)
-
-            if pitch_levels:
-                pitch_shift = pitch_levels.get(part.id, 0)
-
-                if pitch_shift != 0:
-                    part_copy = part_copy.transpose(pitch_shift)
+        if fetch(cache_key, midi_path):
+            continue
 
-            for note in part_copy.recurse().notes:
-                if note.lyrics:
-                    lyric_text = note.lyrics[0].text
-                    note.lyric = lyric_text
-                    #print("SET LYRIC:", lyric_text)
-                    #print("NOTE:", note, "LYRIC:", lyric_text)
-                    
-            # Crear score temporal para asegurar que se exporten las lyrics
-            temp_score = stream.Score()
-            temp_score.insert(0, part_copy)
+        jobs.append((midi_path, table, tempo_map, transform.transpose(pitch_shift)))
+        job_keys.append(cache_key)
 
-            temp_score.write("midi", midi_path)
-            insert_lyrics_into_midi(midi_path, part_copy)
+    # las voces son independientes: se escriben en paralelo
+    written = write_parts(jobs, workers=MIDI_EXPORT_WORKERS if workers is None else workers)
 
-            generated_files.append(midi_path)
+    for cache_key, midi_path in zip(job_keys, written):
+        store(cache_key, midi_path)
 
-    return generated_files
+    # en el mismo orden que selected_parts
+    return midi_files
 
 def export_mix_to_midi(
     xml_path: Path,
@@ -223,82 +275,46 @@ def export_mix_to_midi(
     pitch_levels: dict | None = None,
 ) -> Path:
 
-    score = converter.parse(xml_path)
+    # Igual que por voces: las tablas se comparten y cada voz solo
+    # añade su transformación (altura y volumen) a la global
+    index = get_score_index(xml_path)
+    tables, tempo_map = get_midi_tables(xml_path)
 
-    # aplicar transposición global
-    if transpose != 0:
-        score = score.transpose(transpose)
-        
-        # normalizar KeySignature para evitar >7 sostenidos o bemoles
-        for ks in score.recurse().getElementsByClass("KeySignature"):
-            while ks.sharps > 7:
-                ks.sharps -= 12
-            while ks.sharps < -7:
-                ks.sharps += 12
-
-    if tempo_bpm:
-        score = apply_tempo(score, tempo_bpm)
+    transform = MidiTransform().with_tempo(tempo_bpm).transpose(transpose)
 
     output_path.parent.mkdir(parents=True, exist_ok=True)
 
-    mix_score = stream.Score()
+    tracks = []
+    variant = []
 
-    #selected_ids = {p["id"] for p in selected_parts}
-    selected_map = {}
+    for selected_part in selected_parts:
 
-    for p in selected_parts:
-        real_id = p["id"].split("_")[0]
-        selected_map.setdefault(real_id, []).append(p)
-        
-    #for part in score.parts:
-        #if part.id in selected_ids:
-    part_counter = {}
+        # localizar la parte por su posición en la partitura
+        part_info = index.find_part(selected_part["id"])
 
-    for part in score.parts:
-
-        if part.id not in selected_map:
+        if part_info is None:
             continue
 
-        count = part_counter.get(part.id, 0)
-
-        if count >= len(selected_map[part.id]):
-            continue
-
-        selected_part = selected_map[part.id][count]
-
-        part_counter[part.id] = count + 1
-
-        # copiar la parte para no modificar el score original
-        part_copy = copy.deepcopy(part)
-
-        if pitch_levels:
-            #pitch_shift = pitch_levels.get(part.id, 0)
-            pitch_shift = pitch_levels.get(selected_part["id"], 0)
-
-            if pitch_shift != 0:
-                part_copy = part_copy.transpose(pitch_shift)
-
-        #volume = volumes.get(part.id, 1.0)
+        pitch_shift = pitch_levels.get(selected_part["id"], 0) if pitch_levels else 0
         volume = volumes.get(selected_part["id"], 1.0)
-        
-        # ajustar velocity de las notas
-        for n in part_copy.recurse().notes:
-
-            if hasattr(n, "volume"):
-
-                velocity = n.volume.velocity
-
-                if velocity is None:
-                    velocity = 64
 
-                new_velocity = int(velocity * volume)
+        part_transform = transform.transpose(pitch_shift).scale_velocity(volume)
 
-                new_velocity = max(1, min(127, new_velocity))
+        tracks.append((tables[part_info.position - 1], part_transform))
+        variant.append((selected_part["id"], pitch_shift, volume))
 
-                n.volume.velocity = new_velocity
+    cache_key = export_key(
+        "mix_midi",
+        xml_path,
+        parts=variant,
+        tempo=tempo_bpm,
+        transpose=transpose,
+    )
 
-        mix_score.insert(0, part_copy)
+    if fetch(cache_key, output_path):
+        return output_path
 
-    mix_score.write("midi", output_path)
+    write_mix_midi(output_path, tracks, tempo_map, transform)
+    store(cache_key, output_path)
 
-    return output_path
\ No newline at end of file
+    return output_path
@@ -3,10 +3,21 @@ Servicio encargado de analizar el MusicXML
 y extraer información estructural coral.
 """
 
-from music21 import converter
 from pathlib import Path
 from collections import Counter
-from music21 import key
+from dataclasses import dataclass, field
+from typing import NamedTuple
+
+from music21 import chord
+from music21 import note as m21_note
+from music21 import stream
+from music21 import tempo as m21_tempo
+
+from services.score_repository_service import get_score, get_derived
+from services.lyrics_patch_service import patch_lyrics
+from services.musicxml_reader_service import read_score_summary, score_title
+from services.key_detection_service import estimate_key, new_histogram
+from models.tempo_map import TempoMap
 
 #import shutil
 
@@ -85,149 +96,360 @@ IGNORE_LYRICS = {
 }
 
 
-def analyze_coral_parts(xml_path: Path) -> dict:
+# ==========================================================
+# Índice de la partitura (un solo recorrido)
+# ==========================================================
+class NoteRow(NamedTuple):
     """
-    Analiza un archivo MusicXML y devuelve información coral básica.
+    Una nota de una parte, con offsets absolutos en quarterLength.
     """
+    onset: float
+    duration: float
+    pitch: int | None
+    lyric: str | None
+    syllabic: str | None
+    measure: int | None
 
-    score = converter.parse(xml_path)
 
-    # Detectar tonalidad
-    try:
-        detected_key = score.analyze("key")
-        key_name = f"{detected_key.tonic.name} {detected_key.mode}"
-    except Exception:
-        key_name = "Desconocida"
+@dataclass
+class PartIndex:
+    """
+    Tabla compacta de una parte.
 
-    # Título (si existe)
-    title = score.metadata.title if score.metadata and score.metadata.title else "Sin título"
+    id   → "<part.id>_<posición>" (el mismo que ve la interfaz)
+    name → nombre único de la voz, numerado solo si se repite.
+           Es la clave común de sílabas, fonemas y notas.
+    """
+    id: str
+    raw_id: str
+    position: int
+    name: str
+    notes: list[NoteRow] = field(default_factory=list)
 
-    # Tempo inicial
-    tempo = 120.0
-    try:
-        tempo = score.metronomeMarkBoundaries()[0][2].number
-    except Exception:
-        pass
+    @property
+    def has_lyrics(self) -> bool:
+        return any(row.lyric for row in self.notes)
 
-    # Partes detectadas
-    parts = []
-    raw_names = []
+    def syllables(self) -> list[str]:
+        return [row.lyric for row in self.notes if row.lyric]
 
-    for i, part in enumerate(score.parts, start=1):
-        raw_name = part.partName.strip() if part.partName else f"Parte {i}"
-        raw_names.append(raw_name)
+    def sung_notes(self) -> list[NoteRow]:
+        """
+        Una fila por sílaba, en el mismo orden que syllables().
 
-    # Contar ocurrencias
-    name_counts = Counter(raw_names)
+        Las notas sin letra que siguen sin pausa a una sílaba
+        (melismas, notas ligadas) alargan su duración en lugar de
+        contar como notas aparte.
+        """
 
-    # Generar nombres definitivos
-    name_counter = {}
+        rows = []
+        end = None
 
-    for i, part in enumerate(score.parts, start=1):
+        for row in self.notes:
 
-        #part_id = part.id
-        part_id = f"{part.id}_{i}"
+            if row.lyric:
+                rows.append(row)
+                end = row.onset + row.duration
+                continue
 
-        raw_name = raw_names[i - 1]
+            # nota sin letra pegada a la sílaba anterior
+            if rows and row.onset <= end + 1e-9:
+                end = max(end, row.onset + row.duration)
+                rows[-1] = rows[-1]._replace(duration=end - rows[-1].onset)
 
-        if name_counts[raw_name] > 1:
-            # Hay duplicados → numerar todos
-            if raw_name in name_counter:
-                name_counter[raw_name] += 1
+        return rows
+
+    def words(self) -> list[list[str]]:
+        """
+        Sílabas agrupadas en palabras según el atributo syllabic
+        (begin / middle / end / single) del MusicXML.
+
+        Al aplanar el resultado se obtiene exactamente syllables().
+        """
+
+        words = []
+        open_word = False
+
+        for row in self.notes:
+
+            if not row.lyric:
+                continue
+
+            # middle / end continúan la palabra abierta
+            if open_word and row.syllabic in ("middle", "end"):
+                words[-1].append(row.lyric)
             else:
-                name_counter[raw_name] = 1
+                words.append([row.lyric])
+
+            open_word = row.syllabic in ("begin", "middle")
+
+        return words
 
-            display_name = f"{raw_name} {name_counter[raw_name]}"
-        else:
-            display_name = raw_name
 
+@dataclass
+class ScoreIndex:
+    title: str
+    tempo: float
+    key: str
+    key_confidence: float
+    parts: list[PartIndex]
+    tempo_map: TempoMap
+
+    def find_part(self, part_id: str) -> PartIndex | None:
         """
-        parts.append({
-            "id": part_id,
-            "name": display_name
-        })
+        Busca una parte por el id de la interfaz, que añade el número
+        de fila al id de análisis ("P1_1_0"), o por el id de análisis
+        ("P1_1").
+
+        Se usa la posición que llevan los ids, no el resto: la lectura
+        rápida del análisis no siempre da el mismo part.id que music21.
         """
-        # Detectar si la parte tiene letra real
-        has_lyrics = False
 
-        for note in part.recurse().notes:
+        tokens = str(part_id).split("_")
 
-            if note.lyrics:
+        # id de la interfaz: ..._<posición>_<fila>, con fila = posición - 1
+        if len(tokens) >= 3 and tokens[-1].isdigit() and tokens[-2].isdigit():
+            if int(tokens[-2]) == int(tokens[-1]) + 1:
+                return self._part_at(int(tokens[-2]))
 
-                for lyric in note.lyrics:
+        for part in self.parts:
+            if part_id == part.id:
+                return part
 
-                    if lyric.text:
-                        text = lyric.text.strip().lower()
+        # id de análisis: ..._<posición>
+        if len(tokens) >= 2 and tokens[-1].isdigit():
+            return self._part_at(int(tokens[-1]))
 
-                        if text in IGNORE_LYRICS:
-                            continue
+        return None
 
-                        has_lyrics = True
-                        break
+    def _part_at(self, position: int) -> PartIndex | None:
 
-            if has_lyrics:
-                break
+        if 1 <= position <= len(self.parts):
+            return self.parts[position - 1]
 
+        return None
 
-        parts.append({
-            "id": part_id,
-            "name": display_name,
-            "has_lyrics": has_lyrics
-        })
 
+def _first_lyric(n):
+    """
+    Devuelve la primera lyric con texto real de la nota
+    (ignorando indicaciones musicales) o None.
+    """
 
-    return {
-        "title": title,
-        "tempo": tempo,
-        "parts": parts,
-        "key": key_name
-    }
+    for lyric in n.lyrics:
 
-def extract_syllables_by_part(xml_path: Path) -> dict:
+        if not lyric.text:
+            continue
 
-    score = converter.parse(xml_path)
+        text = lyric.text.strip()
 
-    syllables_by_part = {}
+        if not text or text.lower() in IGNORE_LYRICS:
+            continue
 
-    voice_counter = {}
+        return lyric
 
-    for part in score.parts:
+    return None
 
-        part_name = part.partName.strip() if part.partName else part.id
 
-        syllables = []
+def _part_names(raw_names: list[str | None]) -> list[str]:
+    """
+    Nombres únicos de las partes a partir de sus partName (en orden):
+    las partes sin nombre pasan a "Parte N" y los repetidos se numeran.
 
-        for note in part.recurse().notes:
+    Lo comparten el índice y la lectura rápida (read_score_summary),
+    de modo que ambos dan los mismos nombres de voz.
+    """
 
-            if note.lyrics:
+    raw_names = [
+        name.strip() if name and name.strip() else f"Parte {i}"
+        for i, name in enumerate(raw_names, start=1)
+    ]
+
+    name_counts = Counter(raw_names)
+    name_counter = {}
 
-                for lyric in note.lyrics:
+    names = []
 
-                    if lyric.text:
-                        #syllables.append(lyric.text.strip())
-                        text = lyric.text.strip()
+    for raw_name in raw_names:
 
-                        # filtrar indicaciones musicales
-                        if text.lower() in IGNORE_LYRICS:
-                            continue
+        if name_counts[raw_name] > 1:
+            name_counter[raw_name] = name_counter.get(raw_name, 0) + 1
+            names.append(f"{raw_name} {name_counter[raw_name]}")
+        else:
+            names.append(raw_name)
 
-                        syllables.append(text)
+    return names
 
-        if syllables:
 
-            # contar voces con mismo nombre
-            if part_name not in voice_counter:
-                voice_counter[part_name] = 1
-            else:
-                voice_counter[part_name] += 1
+def _index_part(part, position: int, name: str, tempo_marks: list, histogram) -> PartIndex:
+    """
+    Recorre la parte una sola vez y construye su tabla de notas.
+    Las marcas de tempo encontradas se añaden a tempo_marks y las
+    alturas (ponderadas por duración) al histograma de tonalidad.
+    """
+
+    index = PartIndex(
+        id=f"{part.id}_{position}",
+        raw_id=str(part.id),
+        position=position,
+        name=name,
+    )
+
+    measure_number = None
 
-            voice_name = f"{part_name} {voice_counter[part_name]}"
+    iterator = part.recurse()
 
-            syllables_by_part[voice_name] = syllables
+    for el in iterator:
+
+        if isinstance(el, stream.Measure):
+            measure_number = el.number
+            continue
+
+        if isinstance(el, m21_tempo.MetronomeMark):
+            if el.number is not None:
+                tempo_marks.append((iterator.currentHierarchyOffset(), el.number))
+            continue
+
+        if not isinstance(el, m21_note.NotRest):
+            continue
+
+        if isinstance(el, chord.Chord):
+            pitch = max(p.midi for p in el.pitches) if el.pitches else None
+        elif isinstance(el, m21_note.Note):
+            pitch = el.pitch.midi
+        else:
+            pitch = None
+
+        for p in el.pitches:
+            histogram[p.pitchClass] += el.quarterLength
+
+        lyric = _first_lyric(el)
+
+        index.notes.append(NoteRow(
+            onset=float(iterator.currentHierarchyOffset()),
+            duration=float(el.quarterLength),
+            pitch=pitch,
+            lyric=lyric.text.strip() if lyric else None,
+            syllabic=lyric.syllabic if lyric else None,
+            measure=measure_number,
+        ))
+
+    return index
+
+
+def build_score_index(score) -> ScoreIndex:
+
+    # Título (si existe)
+    title = score_title(score.metadata.title if score.metadata else None) or "Sin título"
+
+    tempo_marks = []
+    histogram = new_histogram()
+
+    names = _part_names([part.partName for part in score.parts])
+
+    parts = [
+        _index_part(part, position, name, tempo_marks, histogram)
+        for position, (part, name) in enumerate(zip(score.parts, names), start=1)
+    ]
+
+    # Tonalidad a partir del histograma recogido en el mismo recorrido
+    key_name, key_confidence = estimate_key(histogram)
+
+    # Tempo inicial: la primera marca de metrónomo de la partitura
+    tempo = min(tempo_marks, key=lambda m: m[0])[1] if tempo_marks else 120.0
+
+    # Mapa de tempo completo (offset → segundos)
+    try:
+        tempo_map = TempoMap.from_boundaries(score.metronomeMarkBoundaries())
+    except Exception:
+        tempo_map = TempoMap.constant(tempo)
+
+    return ScoreIndex(
+        title=title,
+        tempo=tempo,
+        key=key_name or "Desconocida",
+        key_confidence=key_confidence,
+        parts=parts,
+        tempo_map=tempo_map,
+    )
+
+
+def get_score_index(xml_path: Path) -> ScoreIndex:
+    """
+    Índice de la partitura, construido una vez por archivo y sesión.
+    """
+    return get_derived(xml_path, "score_index", build_score_index)
+
+
+# ==========================================================
+# Análisis y extracción
+# ==========================================================
+def analyze_coral_parts(xml_path: Path) -> dict:
+    """
+    Analiza un archivo MusicXML y devuelve información coral básica.
+
+    Se lee el MusicXML en streaming, sin construir el score de music21;
+    si la lectura rápida falla se usa el índice completo.
+    """
+
+    try:
+        return read_score_summary(xml_path, IGNORE_LYRICS, _part_names)
+    except Exception:
+        pass
+
+    index = get_score_index(xml_path)
+
+    parts = [
+        {
+            "id": part.id,
+            "name": part.name,
+            "has_lyrics": part.has_lyrics,
+        }
+        for part in index.parts
+    ]
+
+    return {
+        "title": index.title,
+        "tempo": index.tempo,
+        "parts": parts,
+        "key": index.key,
+        "key_confidence": index.key_confidence,
+    }
+
+
+def extract_syllables_by_part(xml_path: Path) -> dict:
+    """
+    Sílabas (primera letra válida de cada nota) por voz.
+    """
+
+    index = get_score_index(xml_path)
+
+    syllables_by_part = {}
+
+    for part in index.parts:
+
+        syllables = part.syllables()
+
+        if syllables:
+            syllables_by_part[part.name] = syllables
 
     return syllables_by_part
 
 
+def extract_words_by_part(xml_path: Path) -> dict:
+    """
+    Palabras (listas de sílabas) por voz, con las mismas voces
+    y sílabas que extract_syllables_by_part.
+    """
+
+    index = get_score_index(xml_path)
+
+    return {
+        part.name: part.words()
+        for part in index.parts
+        if part.has_lyrics
+    }
+
 
 def apply_lyrics_to_xml(xml_path, updated_lyrics):
     """
@@ -236,7 +458,7 @@ def apply_lyrics_to_xml(xml_path, updated_lyrics):
     backup = xml_path.with_suffix(".backup.xml")
     shutil.copy(xml_path, backup)
 
-    score = converter.parse(xml_path)
+    score = get_score(xml_path, copy_score=True)
 
     part_index = 0
 
@@ -281,23 +503,23 @@ def create_new_xml_with_lyrics(original_xml, new_xml_path, updated_lyrics, log):
 
     log("Creando nuevo XML con la letra modificada...")
 
-    # Cargar partitura original
-    score = converter.parse(original_xml)
+    # Camino rápido: sustituir solo los textos modificados en el
+    # MusicXML original (el resto del archivo no cambia)
+    index = get_score_index(original_xml)
 
-    # Contador para numerar voces con mismo nombre
-    voice_counter = {}
+    if patch_lyrics(original_xml, new_xml_path, index.parts, updated_lyrics, IGNORE_LYRICS):
+        log(f"Nuevo XML guardado en: {new_xml_path}")
+        return
 
-    for part in score.parts:
+    log("No se pudo parchear el XML directamente, se regenera con music21...")
 
-        raw_name = part.partName.strip() if part.partName else "Voz"
+    # Cargar partitura original (copia: se modifica la letra)
+    score = get_score(original_xml, copy_score=True)
 
-        # Numerar voces duplicadas
-        if raw_name not in voice_counter:
-            voice_counter[raw_name] = 1
-        else:
-            voice_counter[raw_name] += 1
+    # Mismos nombres de voz que el índice (y que el editor)
+    names = _part_names([part.partName for part in score.parts])
 
-        part_name = f"{raw_name} {voice_counter[raw_name]}"
+    for part, part_name in zip(score.parts, names):
 
         # Si esta voz no está en el editor, saltar
         if part_name not in updated_lyrics:
@@ -306,19 +528,18 @@ def create_new_xml_with_lyrics(original_xml, new_xml_path, updated_lyrics, log):
         syllables = updated_lyrics[part_name]
         syl_index = 0
 
-        # Recorrer notas de la voz
+        # Recorrer las notas con letra, las mismas que mostró el editor
         for note in part.recurse().notes:
 
             if syl_index >= len(syllables):
                 break
 
-            text = syllables[syl_index]
+            lyric = _first_lyric(note)
 
-            # Si ya existe lyric → reemplazar
-            if note.lyrics:
-                note.lyrics[0].text = text
-            else:
-                note.lyric = text
+            if lyric is None:
+                continue
+
+            lyric.text = syllables[syl_index]
 
             syl_index += 1
 
@@ -0,0 +1,234 @@
+"""
+Caché en disco de archivos exportados (MIDI y WAV).
+
+Al preparar un ensayo se cambia una y otra vez de tempo y de
+tonalidad y se vuelven a generar los mismos archivos. Cada
+exportación se identifica por su variante:
+
+    (hash de la partitura, parte, tempo, transposición global,
+     ajuste de la voz, tonalidad final, volumen)
+
+y el archivo resultante se guarda direccionado por su contenido:
+
+EXPORT_CACHE_DIR/
+  objects/<sha1 del contenido>.mid | .wav   → archivos (sin duplicados)
+  refs/<sha1 de la variante>                → nombre del objeto
+
+Si la variante ya se generó, el archivo se copia desde la caché en
+lugar de volver a exportarlo. Los WAV se identifican por el contenido
+del MIDI del que salen, así que heredan la variante de ese MIDI.
+
+Los objetos menos usados se borran cuando el total supera
+EXPORT_CACHE_MAX_MB.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+from pathlib import Path
+
+from config.config import EXPORT_CACHE_DIR, EXPORT_CACHE_MAX_MB
+from services.score_repository_service import file_fingerprint
+
+# Cambiar si cambia el formato de los archivos generados, para no
+# reutilizar exportaciones antiguas
+_EXPORT_FORMAT_VERSION = 2
+
+_OBJECTS_DIR = EXPORT_CACHE_DIR / "objects"
+_REFS_DIR = EXPORT_CACHE_DIR / "refs"
+
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+_evict_lock = threading.Lock()
+
+
+# ==========================================================
+# Claves
+# ==========================================================
+def _digest(value) -> str:
+    data = json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha1(data.encode("utf-8")).hexdigest()
+
+
+def _file_digest(path: Path) -> str:
+
+    sha = hashlib.sha1()
+
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK_SIZE), b""):
+            sha.update(chunk)
+
+    return sha.hexdigest()
+
+
+def export_key(kind: str, xml_path: Path, **variant) -> str:
+    """
+    Clave de una exportación de la partitura xml_path.
+
+    kind    → tipo de archivo ("part_midi", "mix_midi", ...)
+    variant → parámetros que determinan el resultado
+    """
+
+    score_hash = file_fingerprint(xml_path)[3]
+
+    return _digest([_EXPORT_FORMAT_VERSION, kind, score_hash, variant])
+
+
+def rendered_key(kind: str, source_path: Path, **variant) -> str:
+    """
+    Clave de un archivo generado a partir de otro (p. ej. WAV desde
+    MIDI), por el contenido del archivo de origen.
+    """
+
+    return _digest([_EXPORT_FORMAT_VERSION, kind, _file_digest(source_path), variant])
+
+
+# ==========================================================
+# Lectura
+# ==========================================================
+def lookup(key: str) -> Path | None:
+    """
+    Objeto guardado para esa clave o None.
+    """
+
+    ref_path = _REFS_DIR / key
+
+    try:
+        object_path = _OBJECTS_DIR / ref_path.read_text(encoding="utf-8").strip()
+    except OSError:
+        return None
+
+    if not object_path.is_file():
+        # el objeto se expulsó: la referencia ya no sirve
+        ref_path.unlink(missing_ok=True)
+        return None
+
+    # marcar como usado recientemente (para la expulsión LRU)
+    try:
+        os.utime(object_path)
+    except OSError:
+        pass
+
+    return object_path
+
+
+def fetch(key: str, output_path: Path) -> bool:
+    """
+    Copia en output_path el archivo guardado para esa clave.
+    Devuelve False si no está en la caché.
+    """
+
+    object_path = lookup(key)
+
+    if object_path is None:
+        return False
+
+    try:
+        Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(object_path, output_path)
+    except OSError:
+        return False
+
+    return True
+
+
+# ==========================================================
+# Escritura
+# ==========================================================
+def _tmp_path(path: Path) -> Path:
+    return path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+
+
+def store(key: str, source_path: Path):
+    """
+    Guarda source_path en la caché bajo esa clave.
+
+    Los errores de escritura se ignoran: la caché nunca impide
+    exportar.
+    """
+
+    source_path = Path(source_path)
+
+    try:
+        object_name = _file_digest(source_path) + source_path.suffix.lower()
+        object_path = _OBJECTS_DIR / object_name
+
+        _OBJECTS_DIR.mkdir(parents=True, exist_ok=True)
+        _REFS_DIR.mkdir(parents=True, exist_ok=True)
+
+        # escribir en temporal y renombrar: nunca queda un archivo a medias
+        if object_path.is_file():
+            os.utime(object_path)
+        else:
+            tmp_path = _tmp_path(object_path)
+            shutil.copyfile(source_path, tmp_path)
+            os.replace(tmp_path, object_path)
+
+        ref_path = _REFS_DIR / key
+        tmp_path = _tmp_path(ref_path)
+        tmp_path.write_text(object_name, encoding="utf-8")
+        os.replace(tmp_path, ref_path)
+
+        _evict(keep=object_path)
+
+    except OSError as e:
+        print("Error guardando exportación en caché:", e)
+
+
+# ==========================================================
+# Expulsión por tamaño
+# ==========================================================
+def _evict(keep: Path):
+    """
+    Borra los objetos menos usados hasta quedar por debajo
+    de EXPORT_CACHE_MAX_MB. Las referencias a objetos borrados
+    se descartan al consultarlas.
+    """
+
+    max_bytes = EXPORT_CACHE_MAX_MB * 1024 * 1024
+
+    with _evict_lock:
+
+        files = []
+
+        for path in _OBJECTS_DIR.iterdir():
+
+            if path.suffix == ".tmp":
+                continue
+
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in files)
+
+        for _, size, path in sorted(files):
+
+            if total <= max_bytes:
+                break
+
+            if path == keep:
+                continue
+
+            path.unlink(missing_ok=True)
+            total -= size
+
+
+def get_export_cache_stats() -> dict:
+
+    sizes = [p.stat().st_size for p in _OBJECTS_DIR.glob("*") if p.suffix != ".tmp"]
+
+    return {
+        "objects": len(sizes),
+        "bytes": sum(sizes),
+        "refs": len(list(_REFS_DIR.glob("*"))),
+    }
+
+
+def clear_export_cache():
+
+    shutil.rmtree(EXPORT_CACHE_DIR, ignore_errors=True)
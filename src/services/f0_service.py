@@ -0,0 +1,190 @@
+"""
+Generación vectorizada de curvas de F0 para síntesis cantada.
+
+La curva se construye de una vez con NumPy a partir de los tiempos
+(en segundos) y alturas de las notas:
+
+notas (inicio, duración, MIDI)
+  ↓
+índice de nota por frame (búsqueda binaria)
+  ↓
+portamento + vibrato
+  ↓
+MIDI / Hz / log-F0
+"""
+
+from pathlib import Path
+
+import numpy as np
+
+# Valor de log-F0 para frames sordos (convención HTS / NNSVS)
+LZERO = -1.0e10
+
+F0_UNITS = ("midi", "hz", "lf0")
+
+
+# ==========================================================
+# Construcción de la curva
+# ==========================================================
+def build_f0_contour(
+    starts,
+    durations,
+    pitches,
+    frame_rate: int = 100,
+    total_duration: float | None = None,
+    portamento: float = 0.0,
+    vibrato_depth: float = 0.0,
+    vibrato_rate: float = 5.5,
+    vibrato_delay: float = 0.25,
+    unit: str = "midi",
+) -> np.ndarray:
+    """
+    Devuelve la curva de F0 (float32, un valor por frame).
+
+    starts / durations → segundos de cada nota (ordenadas por inicio)
+    pitches            → altura MIDI; valores < 0 o NaN son notas sordas
+    portamento         → segundos de glissando desde la nota anterior
+                         cuando ambas están ligadas (sin silencio entre medias)
+    vibrato_depth      → amplitud del vibrato en semitonos
+    vibrato_rate       → frecuencia del vibrato en Hz
+    vibrato_delay      → segundos de nota antes de empezar el vibrato
+
+    Los frames se calculan sobre tiempos absolutos, así que las
+    fracciones de frame no se acumulan y la curva no deriva
+    respecto al .lab.
+    """
+
+    if unit not in F0_UNITS:
+        raise ValueError(f"Unidad de F0 desconocida: {unit}")
+
+    starts = np.asarray(starts, dtype=np.float64)
+    durations = np.asarray(durations, dtype=np.float64)
+    pitches = np.asarray(pitches, dtype=np.float64)
+
+    ends = starts + durations
+
+    if total_duration is None:
+        total_duration = float(ends.max()) if len(ends) else 0.0
+
+    n_frames = int(round(total_duration * frame_rate))
+    times = np.arange(n_frames, dtype=np.float64) / frame_rate
+
+    midi = np.zeros(n_frames, dtype=np.float64)
+
+    if len(starts) == 0:
+        return _convert_units(midi, np.zeros(n_frames, dtype=bool), unit)
+
+    # nota activa en cada frame
+    note_idx = np.searchsorted(starts, times, side="right") - 1
+    safe_idx = np.clip(note_idx, 0, None)
+
+    voiced_pitch = (pitches >= 0) & ~np.isnan(pitches)
+
+    voiced = (note_idx >= 0) & (times < ends[safe_idx]) & voiced_pitch[safe_idx]
+
+    midi[voiced] = pitches[safe_idx[voiced]]
+
+    # tiempo transcurrido dentro de la nota
+    elapsed = times - starts[safe_idx]
+
+    # ------------------------------------------------------
+    # Portamento
+    # ------------------------------------------------------
+    if portamento > 0:
+
+        prev_idx = safe_idx - 1
+
+        legato = np.zeros(n_frames, dtype=bool)
+        has_prev = prev_idx >= 0
+
+        prev_clip = np.clip(prev_idx, 0, None)
+
+        # la nota anterior termina justo donde empieza la actual
+        legato[has_prev] = (
+            np.isclose(ends[prev_clip[has_prev]], starts[safe_idx[has_prev]])
+            & voiced_pitch[prev_clip[has_prev]]
+        )
+
+        glide = voiced & legato & (elapsed < portamento)
+
+        if glide.any():
+            frac = elapsed[glide] / portamento
+            smooth = frac * frac * (3.0 - 2.0 * frac)
+
+            previous = pitches[prev_clip[glide]]
+            midi[glide] = previous + (midi[glide] - previous) * smooth
+
+    # ------------------------------------------------------
+    # Vibrato
+    # ------------------------------------------------------
+    if vibrato_depth > 0:
+
+        vib = voiced & (elapsed >= vibrato_delay)
+
+        if vib.any():
+            t = elapsed[vib] - vibrato_delay
+
+            # entrada progresiva durante el primer ciclo
+            ramp = np.minimum(t * vibrato_rate, 1.0)
+
+            midi[vib] += vibrato_depth * ramp * np.sin(2.0 * np.pi * vibrato_rate * t)
+
+    return _convert_units(midi, voiced, unit)
+
+
+def _convert_units(midi: np.ndarray, voiced: np.ndarray, unit: str) -> np.ndarray:
+
+    if unit == "midi":
+        return midi.astype(np.float32)
+
+    hz = np.zeros(len(midi), dtype=np.float64)
+    hz[voiced] = 440.0 * np.power(2.0, (midi[voiced] - 69.0) / 12.0)
+
+    if unit == "hz":
+        return hz.astype(np.float32)
+
+    lf0 = np.full(len(midi), LZERO, dtype=np.float64)
+    lf0[voiced] = np.log(hz[voiced])
+
+    return lf0.astype(np.float32)
+
+
+# ==========================================================
+# Escritura
+# ==========================================================
+def write_f0(contour: np.ndarray, output_path: Path, fmt: str | None = None):
+    """
+    Guarda la curva en texto (un valor por línea), .npy o float32 crudo.
+
+    Si fmt es None se deduce de la extensión:
+    .npy → npy, .raw / .bin / .lf0 → raw, resto → texto.
+    """
+
+    output_path = Path(output_path)
+
+    if fmt is None:
+        suffix = output_path.suffix.lower()
+
+        if suffix == ".npy":
+            fmt = "npy"
+        elif suffix in (".raw", ".bin", ".lf0"):
+            fmt = "raw"
+        else:
+            fmt = "text"
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+
+    contour = np.asarray(contour, dtype=np.float32)
+
+    if fmt == "npy":
+        np.save(output_path, contour)
+
+    elif fmt == "raw":
+        contour.tofile(output_path)
+
+    elif fmt == "text":
+        with open(output_path, "w", encoding="utf-8") as f:
+            f.writelines(f"{value:g}\n" for value in contour.tolist())
+
+    else:
+        raise ValueError(f"Formato de F0 desconocido: {fmt}")
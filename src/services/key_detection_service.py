@@ -0,0 +1,124 @@
+"""
+Detección de tonalidad a partir de un histograma de alturas.
+
+El histograma (12 clases de altura, ponderadas por duración en
+negras) se construye durante la lectura de la partitura, sin
+necesidad de volver a recorrer el score con score.analyze("key").
+
+histograma (12)
+  ↓
+correlación de Pearson con los 24 perfiles (12 tónicas × mayor/menor)
+en una sola multiplicación de matrices
+  ↓
+("B- major", confianza)
+
+La confianza es el coeficiente de correlación de la tonalidad
+elegida (de -1 a 1; cuanto más alto, más clara la tonalidad).
+"""
+
+import numpy as np
+
+from config.config import KEY_DETECTION_PROFILE
+
+# ==========================================================
+# Perfiles (mayor, menor) con tónica en Do
+# ==========================================================
+KEY_PROFILES = {
+    # Aarden-Essen: el que usa por defecto score.analyze("key")
+    "aarden": (
+        [17.7661, 0.145624, 14.9265, 0.160186, 19.8049, 11.3587,
+         0.291248, 22.062, 0.145624, 8.15494, 0.232998, 4.95122],
+        [18.2648, 0.737619, 14.0499, 16.8599, 0.702494, 14.4362,
+         0.702494, 18.6161, 4.56621, 1.93186, 7.37619, 1.75623],
+    ),
+    # Krumhansl-Kessler (algoritmo de Krumhansl-Schmuckler)
+    "krumhansl": (
+        [6.35, 2.23, 3.48, 2.33, 4.38, 4.09, 2.52, 5.19, 2.39, 3.66, 2.29, 2.88],
+        [6.33, 2.68, 3.52, 5.38, 2.60, 3.53, 2.54, 4.75, 3.98, 2.69, 3.34, 3.17],
+    ),
+    # Temperley (corpus Kostka-Payne)
+    "temperley": (
+        [0.748, 0.060, 0.488, 0.082, 0.670, 0.460, 0.096, 0.715, 0.104, 0.366, 0.057, 0.400],
+        [0.712, 0.084, 0.474, 0.618, 0.049, 0.460, 0.105, 0.747, 0.404, 0.067, 0.133, 0.330],
+    ),
+}
+
+# Nombre de la tónica con la grafía de music21 (fila i de la matriz)
+_KEY_NAMES = (
+    [f"{tonic} major" for tonic in ["C", "C#", "D", "E-", "E", "F", "F#", "G", "A-", "A", "B-", "B"]]
+    + [f"{tonic} minor" for tonic in ["C", "C#", "D", "E-", "E", "F", "F#", "G", "G#", "A", "B-", "B"]]
+)
+
+_STEPS = {"C": 0, "D": 2, "E": 4, "F": 5, "G": 7, "A": 9, "B": 11}
+
+_matrices = {}
+
+
+def _profile_matrix(profile: str) -> np.ndarray:
+    """
+    Matriz 24 × 12 con las 24 rotaciones del perfil, centradas y
+    normalizadas (cada fila con media 0 y norma 1).
+    """
+
+    matrix = _matrices.get(profile)
+
+    if matrix is None:
+
+        major, minor = KEY_PROFILES[profile]
+
+        rows = [np.roll(major, tonic) for tonic in range(12)]
+        rows += [np.roll(minor, tonic) for tonic in range(12)]
+
+        matrix = np.array(rows, dtype=float)
+        matrix -= matrix.mean(axis=1, keepdims=True)
+        matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+
+        _matrices[profile] = matrix
+
+    return matrix
+
+
+# ==========================================================
+# Histograma
+# ==========================================================
+def new_histogram() -> np.ndarray:
+    return np.zeros(12)
+
+
+def pitch_class(step: str, alter: float = 0.0) -> int | None:
+    """
+    Clase de altura (0-11) a partir del <step> y <alter> del MusicXML.
+    """
+
+    base = _STEPS.get(step.strip().upper())
+
+    if base is None:
+        return None
+
+    return (base + round(alter)) % 12
+
+
+# ==========================================================
+# Estimación
+# ==========================================================
+def estimate_key(histogram, profile: str | None = None) -> tuple[str | None, float]:
+    """
+    Devuelve (tonalidad, confianza), p. ej. ("F# minor", 0.83).
+
+    La tonalidad usa el mismo formato que "<tónica> <modo>" de music21
+    (el que espera set_initial_key). Si no hay notas devuelve (None, 0.0).
+    """
+
+    h = np.asarray(histogram, dtype=float)
+
+    h = h - h.mean()
+    norm = np.linalg.norm(h)
+
+    if norm == 0:
+        return None, 0.0
+
+    correlations = _profile_matrix(profile or KEY_DETECTION_PROFILE) @ (h / norm)
+
+    best = int(np.argmax(correlations))
+
+    return _KEY_NAMES[best], round(float(correlations[best]), 3)
@@ -0,0 +1,395 @@
+"""
+Escritura incremental de letra en MusicXML.
+
+En lugar de volver a serializar toda la partitura con music21, se lee
+el MusicXML original con expat (biblioteca estándar), se localiza la
+posición en bytes del texto de cada <lyric><text> y solo se sustituyen
+los textos que han cambiado. El resto del archivo queda idéntico byte
+a byte.
+
+MusicXML original
+  ↓
+expat: parte / pentagrama / compás / voz / nota → rangos de <text>
+  ↓
+mismo orden que el índice de music21 (comprobado sílaba a sílaba)
+  ↓
+sustitución de los rangos modificados
+
+Si algo no cuadra (partes distintas, orden distinto, codificación que
+no es UTF-8, letras compuestas con elisión modificadas...) se devuelve
+False y quien llama usa el camino de music21.
+"""
+
+import re
+import zipfile
+from dataclasses import dataclass, field
+from pathlib import Path
+from xml.parsers import expat
+from xml.sax.saxutils import escape
+
+from services.mxl_container_service import is_mxl, read_musicxml_bytes, write_mxl
+
+_ENCODING_RE = re.compile(rb"""^<\?xml[^>]*encoding\s*=\s*["']([^"']+)["']""")
+
+# Etiqueta de apertura completa: los valores de atributo entre comillas
+# pueden contener ">" (p. ej. font-family="a>b")
+_START_TAG_RE = re.compile(rb"""<[^\s/>]+(?:\s+[^\s=/>]+\s*=\s*(?:"[^"]*"|'[^']*'))*\s*(/?)>""")
+
+# Elementos cuyo texto interesa leer
+_TEXT_ELEMENTS = {"text", "elision", "duration", "staff", "voice", "staves"}
+
+
+@dataclass
+class LyricSlot:
+    """
+    Una <lyric> de la partitura.
+
+    text  → texto tal como lo ve music21 (varios <text> se unen con la elisión)
+    span  → (inicio, fin) en bytes del contenido del único <text>,
+            o None si no se puede sustituir en sitio
+    """
+    text: str
+    span: tuple[int, int] | None
+
+
+@dataclass
+class _NoteGroup:
+    """
+    Nota o acorde (las notas con <chord/> se unen a la anterior).
+    """
+    voice: str
+    onset: int
+    order: int
+    lyrics: list[LyricSlot] = field(default_factory=list)
+
+
+# ==========================================================
+# Lectura de posiciones
+# ==========================================================
+class _LyricScanner:
+    """
+    Recorre el MusicXML y agrupa las <lyric> por parte y pentagrama,
+    en el orden en que music21 recorre las notas.
+    """
+
+    def __init__(self, data: bytes):
+        self.data = data
+
+        self.parser = expat.ParserCreate()
+        self.parser.StartElementHandler = self._start
+        self.parser.EndElementHandler = self._end
+        self.parser.CharacterDataHandler = self._chars
+
+        self.root = None
+        self.stack = []
+        self.chars = []
+
+        # (id de parte, nº de pentagramas, {pentagrama: [LyricSlot...]})
+        self.parts = []
+
+        self.note = None
+        self.lyric = None
+        self.text_start = None
+        self.measure_groups = {}
+        self.position = 0
+        self.last_onset = 0
+        self.order = 0
+
+    def scan(self):
+        self.parser.Parse(self.data, True)
+        return self.parts
+
+    # ------------------------------------------------------
+    # Manejadores de expat
+    # ------------------------------------------------------
+    def _start(self, name, attrs):
+
+        if self.root is None:
+            self.root = name
+
+        parent = self.stack[-1] if self.stack else None
+        self.stack.append(name)
+        self.chars = []
+
+        if name == "part" and parent == self.root:
+            self.parts.append([attrs.get("id", ""), 1, {}])
+
+        elif name == "measure" and parent == "part":
+            self.measure_groups = {}
+            self.position = 0
+            self.last_onset = 0
+
+        elif name == "note" and parent == "measure":
+            self.note = {
+                "chord": False,
+                "grace": False,
+                "rest": False,
+                "duration": 0,
+                "staff": 1,
+                "voice": "1",
+                "lyrics": [],
+            }
+
+        elif self.note is not None and parent == "note" and name in ("chord", "grace", "rest"):
+            self.note[name] = True
+
+        elif name == "lyric" and parent == "note" and self.note is not None:
+            self.lyric = {"texts": [], "elisions": []}
+
+        elif name == "text" and parent == "lyric" and self.lyric is not None:
+            tag = _START_TAG_RE.match(self.data, self.parser.CurrentByteIndex)
+
+            # <text/> vacío: no hay contenido que sustituir
+            self.text_start = None if tag.group(1) else tag.end()
+
+    def _end(self, name):
+
+        self.stack.pop()
+        parent = self.stack[-1] if self.stack else None
+        value = "".join(self.chars)
+        self.chars = []
+
+        if name == "text" and parent == "lyric" and self.lyric is not None:
+            end = self.parser.CurrentByteIndex
+            span = (self.text_start, end) if self.text_start is not None else None
+            self.lyric["texts"].append((value, span))
+
+        elif name == "elision" and parent == "lyric" and self.lyric is not None:
+            self.lyric["elisions"].append(value)
+
+        elif name == "lyric" and parent == "note" and self.lyric is not None:
+            self.note["lyrics"].append(self._lyric_slot(self.lyric))
+            self.lyric = None
+
+        elif name == "duration" and parent == "note" and self.note is not None:
+            self.note["duration"] = _to_int(value)
+
+        elif name == "duration" and parent in ("backup", "forward"):
+            delta = _to_int(value)
+            self.position += -delta if parent == "backup" else delta
+
+        elif name == "staff" and parent == "note" and self.note is not None:
+            self.note["staff"] = _to_int(value) or 1
+
+        elif name == "voice" and parent == "note" and self.note is not None:
+            self.note["voice"] = value.strip()
+
+        elif name == "staves" and parent == "attributes":
+            part = self.parts[-1]
+            part[1] = max(part[1], _to_int(value))
+
+        elif name == "note" and parent == "measure" and self.note is not None:
+            self._close_note(self.note)
+            self.note = None
+
+        elif name == "measure" and parent == "part":
+            self._close_measure()
+
+    def _chars(self, data):
+        if self.stack and self.stack[-1] in _TEXT_ELEMENTS:
+            self.chars.append(data)
+
+    # ------------------------------------------------------
+    # Agrupación
+    # ------------------------------------------------------
+    def _lyric_slot(self, lyric) -> LyricSlot:
+
+        texts = lyric["texts"]
+
+        if len(texts) == 1:
+            return LyricSlot(texts[0][0], texts[0][1])
+
+        # letra compuesta: music21 une los textos con la elisión
+        joined = texts[0][0] if texts else ""
+
+        for i, (text, _) in enumerate(texts[1:]):
+            elision = lyric["elisions"][i] if i < len(lyric["elisions"]) else " "
+            joined += elision + text
+
+        return LyricSlot(joined, None)
+
+    def _close_note(self, note):
+
+        if note["chord"]:
+            onset = self.last_onset
+        else:
+            onset = self.position
+            self.last_onset = onset
+
+            if not note["grace"]:
+                self.position += note["duration"]
+
+        # los silencios no son notas para music21 (ni para el índice)
+        if note["rest"]:
+            return
+
+        groups = self.measure_groups.setdefault(note["staff"], [])
+
+        # las notas de un acorde comparten grupo (y sus letras)
+        if note["chord"] and groups:
+            groups[-1].lyrics.extend(note["lyrics"])
+            return
+
+        self.order += 1
+
+        groups.append(_NoteGroup(
+            voice=note["voice"],
+            onset=onset,
+            order=self.order,
+            lyrics=note["lyrics"],
+        ))
+
+    def _close_measure(self):
+
+        staves = self.parts[-1][2]
+
+        for staff, groups in self.measure_groups.items():
+
+            voices = list(dict.fromkeys(g.voice for g in groups))
+
+            # con varias voces music21 recorre cada voz completa
+            if len(voices) > 1:
+                rank = {voice: i for i, voice in enumerate(voices)}
+                groups.sort(key=lambda g: (rank[g.voice], g.onset, g.order))
+            else:
+                groups.sort(key=lambda g: (g.onset, g.order))
+
+            staves.setdefault(staff, []).extend(g.lyrics for g in groups)
+
+
+def _to_int(value: str) -> int:
+    try:
+        return int(float(value))
+    except ValueError:
+        return 0
+
+
+def scan_lyrics(data: bytes) -> list[tuple[str, list[list[LyricSlot]]]]:
+    """
+    Devuelve, en el orden de score.parts de music21, (id de la parte,
+    lista de notas → lista de LyricSlot de cada nota).
+
+    Las partes con varios pentagramas se separan como hace music21
+    ("P1-Staff1", "P1-Staff2"...).
+    """
+
+    scanner = _LyricScanner(data)
+    parts = scanner.scan()
+
+    if scanner.root != "score-partwise":
+        raise ValueError("Solo se admite score-partwise")
+
+    result = []
+
+    for part_id, staves, by_staff in parts:
+
+        if staves > 1:
+            for staff in range(1, staves + 1):
+                result.append((f"{part_id}-Staff{staff}", by_staff.get(staff, [])))
+        else:
+            notes = [lyrics for staff in sorted(by_staff) for lyrics in by_staff[staff]]
+            result.append((part_id, notes))
+
+    return result
+
+
+# ==========================================================
+# Parche
+# ==========================================================
+def patch_lyrics(xml_path: Path, output_path: Path, parts, updated_lyrics: dict, ignore_lyrics: set) -> bool:
+    """
+    Escribe en output_path el MusicXML de xml_path con las sílabas
+    modificadas de updated_lyrics ({nombre de voz: sílabas}).
+
+    parts: partes del índice de la partitura (ScoreIndex.parts), que
+    dan el nombre de cada voz y sus sílabas originales.
+
+    xml_path puede ser un .mxl; si output_path no es .mxl se escribe
+    el MusicXML sin comprimir.
+
+    Devuelve False si no se puede parchear con garantías.
+    """
+
+    xml_path = Path(xml_path)
+
+    # un .xml no se puede guardar como .mxl sin más
+    if is_mxl(output_path) and not is_mxl(xml_path):
+        return False
+
+    # en un .mxl se parchea el MusicXML del interior del zip
+    try:
+        data = read_musicxml_bytes(xml_path)
+    except (OSError, ValueError, zipfile.BadZipFile):
+        return False
+
+    if not _is_utf8(data):
+        return False
+
+    try:
+        scanned = scan_lyrics(data)
+    except (expat.ExpatError, ValueError):
+        return False
+
+    if len(scanned) != len(parts):
+        return False
+
+    replacements = []
+
+    # music21 puede renombrar los id de las partes, así que la
+    # correspondencia se comprueba por posición y por las sílabas
+    for part, (_, notes) in zip(parts, scanned):
+
+        if part.name not in updated_lyrics:
+            continue
+
+        # primera letra válida de cada nota (como _first_lyric)
+        slots = []
+
+        for lyrics in notes:
+            for slot in lyrics:
+                text = slot.text.strip()
+                if text and text.lower() not in ignore_lyrics:
+                    slots.append(slot)
+                    break
+
+        original = part.syllables()
+
+        if [slot.text.strip() for slot in slots] != original:
+            return False
+
+        for slot, old, new in zip(slots, original, updated_lyrics[part.name]):
+
+            if new == old:
+                continue
+
+            if slot.span is None:
+                return False
+
+            replacements.append((slot.span, escape(new).encode("utf-8")))
+
+    # sustituir de atrás hacia delante para no mover los rangos pendientes
+    patched = bytearray(data)
+
+    for (start, end), text in sorted(replacements, reverse=True):
+        patched[start:end] = text
+
+    # salida .mxl: mismo zip con el MusicXML sustituido
+    if is_mxl(output_path):
+        write_mxl(xml_path, output_path, bytes(patched))
+    else:
+        Path(output_path).write_bytes(bytes(patched))
+
+    return True
+
+
+def _is_utf8(data: bytes) -> bool:
+
+    if data.startswith((b"\xff\xfe", b"\xfe\xff")):
+        return False
+
+    match = _ENCODING_RE.match(data.lstrip(b"\xef\xbb\xbf"))
+
+    if match is None:
+        return True
+
+    return match.group(1).decode("ascii", "ignore").lower() in ("utf-8", "utf8", "us-ascii", "ascii")
@@ -0,0 +1,103 @@
+"""
+Exportación de voces a MIDI en paralelo.
+
+Una vez construidas las tablas de la partitura, cada voz es
+independiente. Las tareas (ruta, MidiPartTable, TempoMap,
+MidiTransform) son objetos compactos de NumPy y dataclasses, así que
+se envían a un ProcessPoolExecutor sin pasar objetos de music21:
+
+tareas (una por voz)
+  ↓
+procesos persistentes (spawn) → write_part_midi
+  ↓
+rutas en el mismo orden que las tareas
+
+Los procesos solo importan midi_writer_service (sin music21) y se
+mantienen vivos durante la sesión, de modo que "Generar MIDI",
+"Generar WAV" y la exportación a Reaper no pagan el arranque cada vez.
+"""
+
+import atexit
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+from services.midi_writer_service import write_part_midi
+
+# Con menos notas en total no compensa repartir entre procesos
+_MIN_PARALLEL_NOTES = 2000
+
+_executor = None
+_executor_workers = 0
+_executor_lock = threading.Lock()
+
+
+def _write_job(job) -> Path:
+    midi_path, table, tempo_map, transform = job
+    return write_part_midi(midi_path, table, tempo_map, transform)
+
+
+def _get_executor(workers: int) -> ProcessPoolExecutor:
+
+    global _executor, _executor_workers
+
+    with _executor_lock:
+
+        if _executor is None or _executor_workers != workers:
+
+            if _executor is not None:
+                _executor.shutdown(wait=False, cancel_futures=True)
+
+            _executor = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            _executor_workers = workers
+
+        return _executor
+
+
+def shutdown_export_pool():
+    """
+    Cierra los procesos de exportación (registrado con atexit).
+    """
+
+    global _executor
+
+    with _executor_lock:
+
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+
+atexit.register(shutdown_export_pool)
+
+
+def write_parts(jobs: list[tuple], workers: int = 1) -> list[Path]:
+    """
+    Escribe cada tarea (midi_path, table, tempo_map, transform) y
+    devuelve las rutas en el mismo orden que jobs.
+
+    Con workers <= 1, una sola tarea o pocas notas se escribe en
+    este proceso.
+    """
+
+    total_notes = sum(len(job[1]) for job in jobs)
+
+    if workers <= 1 or len(jobs) <= 1 or total_notes < _MIN_PARALLEL_NOTES:
+        return [_write_job(job) for job in jobs]
+
+    try:
+        # el pool se dimensiona solo con workers, para no recrearlo
+        # cada vez que cambia el número de voces seleccionadas
+        executor = _get_executor(workers)
+        return list(executor.map(_write_job, jobs))
+
+    except BrokenProcessPool:
+        # un proceso ha muerto: se descarta el pool y se escribe en local
+        shutdown_export_pool()
+
+    return [_write_job(job) for job in jobs]
@@ -0,0 +1,219 @@
+"""
+Escritura directa de MIDI a partir de tablas compactas.
+
+En lugar de copiar la parte de music21, envolverla en un Score
+temporal, exportarla con music21 y volver a abrir el archivo con
+mido para añadir la letra, se emiten en una pasada los eventos de
+notas, tempo, armadura, compás y letra a partir de las tablas de
+cada parte (MidiPartTable, construidas en coral_midi_service).
+
+Este módulo no depende de music21, de modo que los procesos de
+exportación en paralelo (midi_export_pool) arrancan rápido.
+
+score de music21
+  ↓ (una vez por partitura, memorizado con el score)
+MidiPartTable por parte (compartidas, solo lectura)
+  ↓ MidiTransform: tempo, transposición, velocidad (al emitir)
+eventos mido → archivo .mid (se escribe una sola vez)
+"""
+
+from pathlib import Path
+
+import mido
+import numpy as np
+
+from models.midi_table import MidiPartTable
+from models.midi_transform import MidiTransform
+
+TICKS_PER_BEAT = 480
+
+# Canal de percusión de General MIDI (no se usa para las voces)
+_DRUM_CHANNEL = 9
+
+_MAJOR_KEYS = {
+    -7: "Cb", -6: "Gb", -5: "Db", -4: "Ab", -3: "Eb", -2: "Bb", -1: "F",
+    0: "C", 1: "G", 2: "D", 3: "A", 4: "E", 5: "B", 6: "F#", 7: "C#",
+}
+_MINOR_KEYS = {
+    -7: "Abm", -6: "Ebm", -5: "Bbm", -4: "Fm", -3: "Cm", -2: "Gm", -1: "Dm",
+    0: "Am", 1: "Em", 2: "Bm", 3: "F#m", 4: "C#m", 5: "G#m", 6: "D#m", 7: "A#m",
+}
+
+# Sustituciones para que la letra sea representable en latin-1
+_LYRIC_REPLACEMENTS = {
+    "“": '"',
+    "”": '"',
+    "‘": "'",
+    "’": "'",
+    "…": "...",
+    "¿": "",
+    "¡": "",
+}
+
+
+# ==========================================================
+# Utilidades
+# ==========================================================
+def clean_lyric(text: str) -> str:
+    """
+    Limpia caracteres problemáticos para MIDI (latin-1).
+    """
+
+    for bad, good in _LYRIC_REPLACEMENTS.items():
+        text = text.replace(bad, good)
+
+    return text.encode("latin-1", "ignore").decode("latin-1")
+
+
+def _key_name(sharps: int, mode: str | None) -> str:
+
+    if mode == "minor":
+        return _MINOR_KEYS[sharps]
+
+    return _MAJOR_KEYS[sharps]
+
+
+def _ticks(offsets) -> np.ndarray:
+    return np.rint(np.asarray(offsets, dtype=np.float64) * TICKS_PER_BEAT).astype(np.int64)
+
+
+def _to_track(events: list) -> mido.MidiTrack:
+    """
+    events: [(tick, orden, mensaje)] → pista con tiempos delta.
+
+    A igual tick van primero los note_off (orden 0), luego los
+    metadatos (1) y por último los note_on (2), para que una nota
+    repetida no se corte.
+    """
+
+    events.sort(key=lambda e: (e[0], e[1]))
+
+    track = mido.MidiTrack()
+    last = 0
+
+    for tick, _, msg in events:
+        msg.time = tick - last
+        track.append(msg)
+        last = tick
+
+    track.append(mido.MetaMessage("end_of_track", time=0))
+
+    return track
+
+
+# ==========================================================
+# Pistas
+# ==========================================================
+def _conductor_track(tempo_map, table: MidiPartTable, transform: MidiTransform) -> mido.MidiTrack:
+    """
+    Pista 0: tempo, compases y armaduras.
+    """
+
+    events = []
+
+    tempo_map = transform.tempo_map(tempo_map)
+
+    for start, bpm in zip(_ticks(tempo_map.starts).tolist(), tempo_map.bpms.tolist()):
+        events.append((start, 1, mido.MetaMessage("set_tempo", tempo=mido.bpm2tempo(bpm))))
+
+    for offset, numerator, denominator in table.time_signatures:
+        events.append((
+            int(_ticks(offset)),
+            1,
+            mido.MetaMessage("time_signature", numerator=numerator, denominator=denominator),
+        ))
+
+    for offset, sharps, mode in table.key_signatures:
+        events.append((
+            int(_ticks(offset)),
+            1,
+            mido.MetaMessage("key_signature", key=_key_name(transform.key_signature(sharps), mode)),
+        ))
+
+    return _to_track(events)
+
+
+def _part_track(table: MidiPartTable, channel: int, transform: MidiTransform) -> mido.MidiTrack:
+    """
+    Pista de una parte: nombre, programa, letra y notas.
+    """
+
+    events = [
+        (0, 1, mido.MetaMessage("track_name", name=clean_lyric(table.name))),
+    ]
+
+    if table.program is not None:
+        events.append((0, 1, mido.Message("program_change", channel=channel, program=table.program)))
+
+    for offset, text in table.lyrics:
+        events.append((int(_ticks(offset)), 1, mido.MetaMessage("lyrics", text=clean_lyric(text))))
+
+    notes = table.notes
+
+    pitches = transform.pitches(notes["pitch"]).tolist()
+    velocities = transform.velocities(notes["velocity"]).tolist()
+
+    starts = _ticks(notes["onset"])
+    ends = np.maximum(_ticks(notes["onset"] + notes["duration"]), starts + 1).tolist()
+    starts = starts.tolist()
+
+    for pitch, start, end, velocity in zip(pitches, starts, ends, velocities):
+        events.append((start, 2, mido.Message("note_on", channel=channel, note=pitch, velocity=velocity)))
+        events.append((end, 0, mido.Message("note_off", channel=channel, note=pitch, velocity=0)))
+
+    return _to_track(events)
+
+
+# ==========================================================
+# Archivos
+# ==========================================================
+def write_part_midi(
+    midi_path: Path,
+    table: MidiPartTable,
+    tempo_map,
+    transform: MidiTransform | None = None,
+) -> Path:
+    """
+    Escribe el MIDI de una voz (pista de tempo + pista de la voz).
+    """
+
+    transform = transform or MidiTransform()
+
+    mid = mido.MidiFile(type=1, ticks_per_beat=TICKS_PER_BEAT)
+
+    mid.tracks.append(_conductor_track(tempo_map, table, transform))
+    mid.tracks.append(_part_track(table, 0, transform))
+
+    mid.save(midi_path)
+
+    return Path(midi_path)
+
+
+def write_mix_midi(
+    midi_path: Path,
+    tracks: list[tuple[MidiPartTable, MidiTransform]],
+    tempo_map,
+    transform: MidiTransform | None = None,
+) -> Path:
+    """
+    Escribe varias voces en un mismo MIDI, una pista y un canal por voz.
+
+    tracks: (tabla, transformación de la voz); transform es la
+    transformación global, que da el tempo y la armadura común.
+    """
+
+    transform = transform or MidiTransform()
+
+    mid = mido.MidiFile(type=1, ticks_per_beat=TICKS_PER_BEAT)
+
+    if tracks:
+        mid.tracks.append(_conductor_track(tempo_map, tracks[0][0], transform))
+
+    channels = [c for c in range(16) if c != _DRUM_CHANNEL]
+
+    for i, (table, part_transform) in enumerate(tracks):
+        mid.tracks.append(_part_track(table, channels[i % len(channels)], part_transform))
+
+    mid.save(midi_path)
+
+    return Path(midi_path)
@@ -0,0 +1,398 @@
+"""
+Lectura rápida de MusicXML para el análisis inicial.
+
+Para el botón "Analizar" solo hacen falta el título, el tempo, la
+tonalidad y las voces (con o sin letra). En lugar de construir el
+score completo de music21 se recorre el MusicXML (o el .mxl) con
+iterparse en una sola pasada, descartando cada compás en cuanto se
+ha leído, de modo que la memoria no crece con la partitura.
+
+MusicXML / .mxl
+  ↓
+iterparse: score-part / compás / nota / dirección
+  ↓
+nombres e id de parte como music21, marcas de metrónomo,
+letra por pentagrama, histograma de alturas
+  ↓
+mismo diccionario que analyze_coral_parts
+
+El parse completo con music21 solo ocurre cuando un paso posterior
+(sílabas, MIDI, audio...) necesita el índice de la partitura.
+"""
+
+from pathlib import Path
+from xml.etree import ElementTree as ET
+
+from music21 import instrument as m21_instrument
+
+from services.key_detection_service import estimate_key, new_histogram, pitch_class
+from services.mxl_container_service import open_musicxml
+
+# Títulos que en realidad son el nombre del archivo
+_FILE_NAME_SUFFIXES = (".xml", ".mxl", ".musicxml", ".mscz", ".mid", ".midi")
+
+class _PartReader:
+    """
+    Estado de una <part> mientras se recorre.
+    """
+
+    def __init__(self, part_id: str, info: dict):
+        self.part_id = part_id
+        self.info = info
+
+        self.divisions = 1.0
+        self.staves = 1
+        self.staff_keys = set()
+
+        # offset del compás actual y posición dentro de él (en negras)
+        self.measure_offset = 0.0
+        self.position = 0.0
+        self.measure_length = 0.0
+        self.chord_duration = 0.0
+
+        # pentagramas con alguna nota con letra válida
+        self.lyric_staves = set()
+
+    def advance(self, quarters: float):
+        self.position += quarters
+        self.measure_length = max(self.measure_length, self.position)
+
+    def close_measure(self):
+        self.measure_offset += self.measure_length
+        self.position = 0.0
+        self.measure_length = 0.0
+
+
+# ==========================================================
+# Utilidades
+# ==========================================================
+def _text(el, path: str) -> str | None:
+
+    child = el.find(path)
+
+    if child is None or child.text is None:
+        return None
+
+    return child.text
+
+
+def _clean(value: str | None) -> str | None:
+    """
+    Mismo saneado que aplica music21 a los nombres de parte: una
+    etiqueta sin texto da None, pero una con solo espacios da "".
+    """
+
+    if value is None:
+        return None
+
+    return value.strip().replace("\n", " ")
+
+
+def _number(value: str | None, default: float = 0.0) -> float:
+
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def _valid_lyric(lyric, ignore_lyrics: set) -> bool:
+    """
+    Como _first_lyric: texto real que no sea una indicación musical.
+    Varios <text> se unen con la elisión, igual que en music21.
+    """
+
+    texts = [t.text or "" for t in lyric.findall("text")]
+
+    if not texts:
+        return False
+
+    elisions = [e.text or " " for e in lyric.findall("elision")]
+
+    joined = texts[0]
+
+    for i, text in enumerate(texts[1:]):
+        joined += (elisions[i] if i < len(elisions) else " ") + text
+
+    text = joined.strip()
+
+    return bool(text) and text.lower() not in ignore_lyrics
+
+
+def _part_info(score_part) -> dict:
+
+    instrument = score_part.find("score-instrument")
+
+    info = {
+        "part_name": _clean(_text(score_part, "part-name")),
+        "part_abbreviation": _clean(_text(score_part, "part-abbreviation")),
+        "instrument_name": None,
+        "instrument_abbreviation": None,
+    }
+
+    if instrument is not None:
+        info["instrument_name"] = _clean(_text(instrument, "instrument-name"))
+        info["instrument_abbreviation"] = _clean(_text(instrument, "instrument-abbreviation"))
+
+    # sin nombre escrito, music21 usa el del instrumento del programa MIDI
+    if info["instrument_name"] is None:
+        info["instrument_name"] = _midi_program_name(_text(score_part, "midi-instrument/midi-program"))
+
+    return info
+
+
+def _midi_program_name(program: str | None) -> str | None:
+
+    if program is None or not program.strip():
+        return None
+
+    # como music21: programas 1-128, aunque muchos pianos vienen como 0
+    try:
+        return m21_instrument.instrumentFromMidiProgram(max(0, int(program) - 1)).instrumentName
+    except Exception:
+        return None
+
+
+def _best_name(info: dict) -> str | None:
+    """
+    Instrument.bestName() de music21, que da el id de la parte.
+    """
+
+    for name in ("part_name", "part_abbreviation", "instrument_name", "instrument_abbreviation"):
+        if info[name] is not None:
+            return info[name]
+
+    return None
+
+
+# ==========================================================
+# Lectura
+# ==========================================================
+def _read_note(reader: _PartReader, note, histogram, ignore_lyrics: set):
+
+    is_chord = note.find("chord") is not None
+    is_grace = note.find("grace") is not None
+
+    duration = 0.0 if is_grace else _number(_text(note, "duration")) / reader.divisions
+
+    # en music21 todas las notas de un acorde duran lo que la primera
+    if is_chord:
+        duration = reader.chord_duration
+    else:
+        reader.chord_duration = duration
+        reader.advance(duration)
+
+    staff = int(_number(_text(note, "staff"), 1))
+    reader.staff_keys.add(staff)
+
+    if note.find("rest") is not None:
+        return
+
+    pitch = note.find("pitch")
+
+    # histograma ponderado por duración (como el análisis de music21)
+    if pitch is not None:
+        pc = pitch_class(_text(pitch, "step") or "", _number(_text(pitch, "alter")))
+
+        if pc is not None:
+            histogram[pc] += duration
+
+    if any(_valid_lyric(lyric, ignore_lyrics) for lyric in note.findall("lyric")):
+        reader.lyric_staves.add(staff)
+
+
+def _read_direction(reader: _PartReader, direction, tempo_marks: list):
+
+    offset = _number(_text(direction, "offset")) / reader.divisions
+
+    staff = _text(direction, "staff")
+
+    if staff is not None:
+        reader.staff_keys.add(int(_number(staff, 1)))
+
+    # music21 solo crea marcas con número a partir de <metronome>
+    for per_minute in direction.iterfind("direction-type/metronome/per-minute"):
+
+        value = _number(per_minute.text, None)
+
+        if value is None:
+            continue
+
+        number = int(value) if value.is_integer() else value
+
+        tempo_marks.append((reader.measure_offset + reader.position + offset, number))
+
+
+def _read_attributes(reader: _PartReader, attributes):
+
+    divisions = _number(_text(attributes, "divisions"))
+
+    if divisions > 0:
+        reader.divisions = divisions
+
+    staves = _text(attributes, "staves")
+
+    if staves is not None:
+        reader.staves = max(reader.staves, int(_number(staves, 1)))
+
+    for clef in attributes.findall("clef"):
+        if clef.get("number"):
+            reader.staff_keys.add(int(_number(clef.get("number"), 1)))
+
+
+def score_title(title: str | None, movement_title: str | None = None) -> str | None:
+    """
+    Título de la obra o None si no sirve como título: vacío, igual al
+    del movimiento (como descarta music21) o un nombre de archivo
+    ("bwv325.mxl") que dejan algunos exportadores.
+    """
+
+    if not title or not title.strip():
+        return None
+
+    title = title.strip()
+
+    if title == movement_title or title.lower().endswith(_FILE_NAME_SUFFIXES):
+        return None
+
+    return title
+
+
+def read_score_summary(xml_path: Path, ignore_lyrics: set, part_names) -> dict:
+    """
+    Título, tempo inicial, tonalidad (y su confianza) y voces de la
+    partitura, con la misma forma que analyze_coral_parts.
+
+    part_names: función que da los nombres únicos de voz a partir de
+    los partName (la misma que usa el índice de la partitura).
+    """
+
+    xml_path = Path(xml_path)
+
+    title = None
+    movement_title = None
+    part_infos = {}
+    part_readers = []
+    tempo_marks = []
+    histogram = new_histogram()
+
+    reader = None
+    root = None
+    stack = []
+
+    with open_musicxml(xml_path) as stream:
+
+        for event, el in ET.iterparse(stream, events=("start", "end")):
+
+            if event == "start":
+
+                if root is None:
+                    root = el.tag
+
+                    if root != "score-partwise":
+                        raise ValueError("Solo se admite score-partwise")
+
+                if el.tag == "part" and len(stack) == 1:
+                    part_id = el.get("id", "")
+                    reader = _PartReader(part_id, part_infos.get(part_id, _part_info(ET.Element("score-part"))))
+                    part_readers.append(reader)
+
+                stack.append(el)
+                continue
+
+            stack.pop()
+            parent = stack[-1] if stack else None
+            parent_tag = parent.tag if parent is not None else None
+
+            if el.tag == "work-title" and parent_tag == "work":
+                title = el.text
+
+            elif el.tag == "movement-title" and parent_tag == root:
+                movement_title = el.text
+
+            elif el.tag == "score-part":
+                part_infos[el.get("id", "")] = _part_info(el)
+                el.clear()
+
+            elif reader is not None and parent_tag == "measure":
+
+                if el.tag == "note":
+                    _read_note(reader, el, histogram, ignore_lyrics)
+
+                elif el.tag in ("backup", "forward"):
+                    delta = _number(_text(el, "duration")) / reader.divisions
+                    if el.tag == "backup":
+                        reader.position -= delta
+                    else:
+                        reader.advance(delta)
+
+                elif el.tag == "direction":
+                    _read_direction(reader, el, tempo_marks)
+
+                elif el.tag == "attributes":
+                    _read_attributes(reader, el)
+
+            elif el.tag == "measure" and parent_tag == "part" and reader is not None:
+                reader.close_measure()
+
+                # descartar el compás ya leído
+                parent.remove(el)
+
+            elif el.tag == "part" and parent_tag == root:
+                parent.remove(el)
+                reader = None
+
+    # ------------------------------------------------------
+    # Partes (separando pentagramas como music21)
+    # ------------------------------------------------------
+    raw_parts = []
+
+    for reader in part_readers:
+
+        best = _best_name(reader.info)
+
+        # Part.partName recurre al nombre del instrumento
+        part_name = reader.info["part_name"]
+        if part_name is None:
+            part_name = reader.info["instrument_name"]
+
+        if reader.staves > 1:
+
+            staff_keys = sorted(reader.staff_keys) or list(range(1, reader.staves + 1))
+
+            for staff in staff_keys:
+                raw_parts.append((
+                    f"{reader.part_id}-Staff{staff}",
+                    part_name,
+                    staff in reader.lyric_staves,
+                ))
+        else:
+            raw_parts.append((
+                best if best is not None else reader.part_id,
+                part_name,
+                bool(reader.lyric_staves),
+            ))
+
+    names = part_names([name for _, name, _ in raw_parts])
+
+    parts = [
+        {
+            "id": f"{part_id}_{position}",
+            "name": name,
+            "has_lyrics": has_lyrics,
+        }
+        for position, ((part_id, _, has_lyrics), name) in enumerate(zip(raw_parts, names), start=1)
+    ]
+
+    # Tempo inicial: la primera marca de metrónomo de la partitura
+    tempo = min(tempo_marks, key=lambda m: m[0])[1] if tempo_marks else 120.0
+
+    key_name, key_confidence = estimate_key(histogram)
+
+    return {
+        "title": score_title(title, movement_title) or "Sin título",
+        "tempo": tempo,
+        "parts": parts,
+        "key": key_name or "Desconocida",
+        "key_confidence": key_confidence,
+    }
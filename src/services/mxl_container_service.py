@@ -0,0 +1,337 @@
+"""
+Acceso a MusicXML comprimido (.mxl).
+
+Un .mxl es un zip con META-INF/container.xml, que indica cuál de
+los archivos es la partitura (rootfile). Este módulo:
+
+- localiza el rootfile leyendo container.xml
+- entrega el MusicXML como flujo, descomprimiendo directamente del
+  zip al lector (sin extraer a un temporal)
+- guarda en memoria los bytes descomprimidos durante la sesión, de
+  modo que volver a leer el mismo .mxl no vuelve a descomprimir
+- parsea con music21 a partir de esos bytes
+- escribe un .mxl sustituyendo el rootfile (resto del zip intacto)
+
+Los .xml normales se leen directamente del disco.
+"""
+
+import codecs
+import io
+import re
+import threading
+import zipfile
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from xml.etree import ElementTree as ET
+
+from music21 import converter
+
+from config.config import MXL_CACHE_MAX_MB
+
+_CONTAINER_PATH = "META-INF/container.xml"
+
+# Marcas de orden de bytes, de la más larga a la más corta
+_BOMS = [
+    (codecs.BOM_UTF32_LE, "utf-32-le"),
+    (codecs.BOM_UTF32_BE, "utf-32-be"),
+    (codecs.BOM_UTF8, "utf-8"),
+    (codecs.BOM_UTF16_LE, "utf-16-le"),
+    (codecs.BOM_UTF16_BE, "utf-16-be"),
+]
+
+_XML_ENCODING = re.compile(rb"""^<\?xml[^>]*?encoding\s*=\s*["']([A-Za-z0-9._-]+)["']""")
+
+
+def is_mxl(xml_path: Path) -> bool:
+    return Path(xml_path).suffix.lower() == ".mxl"
+
+
+# ==========================================================
+# Contenedor
+# ==========================================================
+def rootfile_name(zf: zipfile.ZipFile) -> str:
+    """
+    Nombre del MusicXML principal dentro del .mxl.
+
+    Se usa el primer rootfile de container.xml; si no existe, el
+    primer .xml / .musicxml fuera de META-INF.
+    """
+
+    try:
+        container = ET.fromstring(zf.read(_CONTAINER_PATH))
+    except (KeyError, ET.ParseError):
+        container = None
+
+    if container is not None:
+        for rootfile in container.iter():
+            if rootfile.tag.rsplit("}", 1)[-1] != "rootfile":
+                continue
+            path = rootfile.get("full-path")
+            if path and path in zf.NameToInfo:
+                return path
+
+    for name in zf.namelist():
+        if not name.startswith("META-INF/") and name.lower().endswith((".xml", ".musicxml")):
+            return name
+
+    raise ValueError("El archivo .mxl no contiene ningún MusicXML")
+
+
+def uncompressed_size(xml_path: Path) -> int:
+    """
+    Tamaño del MusicXML sin comprimir (sin descomprimir nada).
+    """
+
+    xml_path = Path(xml_path)
+
+    if not is_mxl(xml_path):
+        return xml_path.stat().st_size
+
+    with zipfile.ZipFile(xml_path) as zf:
+        return zf.getinfo(rootfile_name(zf)).file_size
+
+
+# ==========================================================
+# Caché de bytes descomprimidos
+# ==========================================================
+class _BytesCache:
+    """
+    LRU en memoria de MusicXML descomprimidos, limitada en bytes.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key) -> bytes | None:
+
+        with self._lock:
+
+            data = self._entries.get(key)
+
+            if data is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+
+            return data
+
+    def put(self, key, data: bytes):
+
+        if len(data) > self.max_bytes:
+            return
+
+        with self._lock:
+
+            # versiones anteriores del mismo archivo ya no sirven
+            for old_key in [k for k in self._entries if k[0] == key[0]]:
+                del self._entries[old_key]
+
+            self._entries[key] = data
+
+            while sum(len(d) for d in self._entries.values()) > self.max_bytes:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": sum(len(d) for d in self._entries.values()),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+_cache = _BytesCache(MXL_CACHE_MAX_MB * 1024 * 1024)
+
+
+def _cache_key(xml_path: Path) -> tuple:
+
+    path = Path(xml_path).resolve()
+    stat = path.stat()
+
+    return (str(path), stat.st_size, stat.st_mtime_ns)
+
+
+class _CachingReader(io.RawIOBase):
+    """
+    Flujo que lee del zip y, si se consume entero, guarda los bytes
+    leídos en la caché.
+    """
+
+    def __init__(self, zf: zipfile.ZipFile, name: str, key: tuple):
+        self._zf = zf
+        self._stream = zf.open(name)
+        self._key = key
+        self._chunks = []
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: int = -1) -> bytes:
+
+        data = self._stream.read(size)
+
+        if data:
+            self._chunks.append(data)
+        elif self._chunks is not None:
+            _cache.put(self._key, b"".join(self._chunks))
+            self._chunks = None
+
+        return data
+
+    def readinto(self, buffer) -> int:
+
+        data = self.read(len(buffer))
+        buffer[:len(data)] = data
+
+        return len(data)
+
+    def close(self):
+
+        if not self.closed:
+            self._stream.close()
+            self._zf.close()
+
+        super().close()
+
+
+@contextmanager
+def open_musicxml(xml_path: Path):
+    """
+    Flujo binario con el MusicXML de xml_path (.xml o .mxl).
+
+    Para un .mxl se descomprime a medida que se lee, salvo que sus
+    bytes ya estén en la caché de la sesión.
+    """
+
+    xml_path = Path(xml_path)
+
+    if not is_mxl(xml_path):
+        with open(xml_path, "rb") as f:
+            yield f
+        return
+
+    key = _cache_key(xml_path)
+    data = _cache.get(key)
+
+    if data is not None:
+        yield io.BytesIO(data)
+        return
+
+    zf = zipfile.ZipFile(xml_path)
+
+    try:
+        stream = _CachingReader(zf, rootfile_name(zf), key)
+    except Exception:
+        zf.close()
+        raise
+
+    with stream:
+        yield stream
+
+
+def read_musicxml_bytes(xml_path: Path) -> bytes:
+    """
+    Bytes del MusicXML de xml_path (.xml o .mxl, este último cacheado).
+    """
+
+    xml_path = Path(xml_path)
+
+    if not is_mxl(xml_path):
+        return xml_path.read_bytes()
+
+    key = _cache_key(xml_path)
+    data = _cache.get(key)
+
+    if data is None:
+
+        with zipfile.ZipFile(xml_path) as zf:
+            data = zf.read(rootfile_name(zf))
+
+        _cache.put(key, data)
+
+    return data
+
+
+def get_mxl_cache_stats() -> dict:
+    return _cache.stats()
+
+
+# ==========================================================
+# music21
+# ==========================================================
+def decode_musicxml(data: bytes) -> str:
+    """
+    Texto del MusicXML según su BOM o, si no tiene, según la
+    declaración de codificación (UTF-8 por defecto).
+    """
+
+    for bom, encoding in _BOMS:
+        if data.startswith(bom):
+            return data[len(bom):].decode(encoding)
+
+    match = _XML_ENCODING.match(data.lstrip()[:200])
+    encoding = match.group(1).decode("ascii") if match else "utf-8"
+
+    return data.decode(encoding)
+
+
+def parse_score(xml_path: Path):
+    """
+    converter.parse de la partitura; los .mxl se parsean desde los
+    bytes ya descomprimidos en lugar de volver a abrir el zip.
+    """
+
+    xml_path = Path(xml_path)
+
+    if not is_mxl(xml_path):
+        return converter.parse(xml_path)
+
+    try:
+        text = decode_musicxml(read_musicxml_bytes(xml_path))
+    except (UnicodeDecodeError, LookupError):
+        # codificación no reconocida: music21 abre el .mxl por su cuenta
+        return converter.parse(xml_path)
+
+    score = converter.parse(text, format="musicxml")
+
+    if score.metadata is not None:
+        score.metadata.filePath = str(xml_path)
+
+    return score
+
+
+# ==========================================================
+# Escritura
+# ==========================================================
+def write_mxl(source_path: Path, output_path: Path, data: bytes):
+    """
+    Escribe en output_path una copia del .mxl source_path con el
+    rootfile sustituido por data.
+    """
+
+    output_path = Path(output_path)
+    tmp_path = output_path.with_name(output_path.name + ".tmp")
+
+    with zipfile.ZipFile(source_path) as src:
+
+        name = rootfile_name(src)
+
+        with zipfile.ZipFile(tmp_path, "w") as dst:
+            for info in src.infolist():
+                if info.filename == name:
+                    dst.writestr(info, data, compress_type=zipfile.ZIP_DEFLATED)
+                else:
+                    dst.writestr(info, src.read(info.filename))
+
+    tmp_path.replace(output_path)
@@ -1,3 +1,16 @@
 class BasePhonemeConverter:
+
+    # Cambiar al modificar las reglas: invalida la caché de fonemas
+    cache_version = "1"
+
     def convert(self, syllable: str) -> list[str]:
-        raise NotImplementedError
\ No newline at end of file
+        raise NotImplementedError
+
+    def convert_many(self, syllables: list[str]) -> list[list[str]]:
+        """
+        Convierte una lista de sílabas de una vez.
+
+        Por defecto llama a convert() sílaba a sílaba; los conversores
+        con un coste fijo por llamada (procesos externos) lo redefinen.
+        """
+        return [self.convert(syl) for syl in syllables]
@@ -1,34 +1,63 @@
-from .base_converter import BasePhonemeConverter
-
-
-class BasqueConverter(BasePhonemeConverter):
-
-    def convert(self, s: str) -> list[str]:
-
-        s = s.lower().replace("_", "")
-
-        if not s:
-            return []
-
-        rules = {
-            "tx": "tʃ",
-            "tz": "ts",
-            "ts": "ts",
-            "dd": "d",
-            "tt": "t",
-        }
-
-        tokens = []
-
-        i = 0
-        while i < len(s):
-
-            if s[i:i+2] in rules:
-                tokens.append(rules[s[i:i+2]])
-                i += 2
-                continue
-
-            tokens.append(s[i])
-            i += 1
-
-        return tokens
\ No newline at end of file
+from .rule_converter import RuleBasedConverter
+
+_VOWEL = "[aeiou]"
+
+
+class BasqueConverter(RuleBasedConverter):
+    """
+    Euskera batua.
+    """
+
+    # reglas ampliadas respecto a la versión de dos caracteres
+    cache_version = "2"
+
+    RULES = {
+        # vocales
+        "a": "a", "e": "e", "i": "i", "o": "o", "u": "u",
+        "á": "a", "é": "e", "í": "i", "ó": "o", "ú": "u", "ü": "u",
+
+        # africadas y sibilantes
+        "tx": "tʃ",
+        "tz": "ts",
+        "ts": "ts",
+        "x": "ʃ",
+        "z": "s",
+        "s": "s",
+
+        # palatales
+        "tt": "c",
+        "dd": "ɟ",
+        "ll": "ʎ",
+        "ñ": "ɲ",
+        "j": "j",
+        "y": "j",
+
+        # vibrantes: r simple entre vocales, rr múltiple
+        "r": "ɾ",
+        "rr": "r",
+
+        # resto de consonantes
+        "b": "b", "v": "b",
+        "c": "k", "k": "k", "q": "k",
+        "d": "d",
+        "f": "f",
+        "g": "g",
+        "h": "",
+        "l": "l",
+        "m": "m",
+        "n": "n",
+        "p": "p",
+        "t": "t",
+        "w": "w",
+    }
+
+    CONTEXT_RULES = [
+        # r al principio o al final de palabra, o ante consonante → múltiple
+        ("r", "^", None, "r"),
+        ("r", None, "$", "r"),
+        ("r", None, "[^aeiouáéíóú]", "r"),
+
+        # palatalización tras diptongo en i: "baina" → baiɲa, "oilo" → oiʎo
+        ("n", "[aeou]i", _VOWEL, "ɲ"),
+        ("l", "[aeou]i", _VOWEL, "ʎ"),
+    ]
@@ -0,0 +1,278 @@
+"""
+Caché de fonemas en dos niveles.
+
+El texto coral se repite muchísimo (estribillos, las mismas palabras
+en todas las voces), así que cada sílaba se convierte una sola vez:
+
+sílaba normalizada
+  ↓
+LRU en memoria
+  ↓
+SQLite en disco (CACHE_DIR, se conserva entre sesiones)
+  ↓
+conversor real (eSpeak, euskera...)
+
+La clave es (idioma, conversor y versión, sílaba normalizada): si se
+cambian las reglas de un conversor basta con subir su cache_version.
+"""
+
+import json
+import sqlite3
+import threading
+import unicodedata
+from collections import OrderedDict
+
+from .base_converter import BasePhonemeConverter
+
+from config.config import PHONEME_CACHE_PATH, PHONEME_CACHE_MAX_ENTRIES
+
+# Límite de parámetros por consulta de SQLite
+_SQL_CHUNK = 500
+
+
+def normalize_syllable(syllable: str) -> str:
+    """
+    Forma canónica de la sílaba para la clave de la caché.
+    """
+
+    syllable = unicodedata.normalize("NFC", syllable)
+
+    return syllable.replace("_", "").strip().lower()
+
+
+# ==========================================================
+# Almacén compartido
+# ==========================================================
+class PhonemeCache:
+
+    def __init__(self, db_path, max_entries: int):
+        self.db_path = db_path
+        self.max_entries = max_entries
+
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def get_many(self, keys: list[tuple]) -> dict:
+        """
+        Devuelve {clave: fonemas} de las claves que ya estén en caché.
+        """
+
+        found = {}
+
+        with self._lock:
+
+            missing = []
+
+            for key in keys:
+
+                value = self._memory.get(key)
+
+                if value is None:
+                    missing.append(key)
+                    continue
+
+                self._memory.move_to_end(key)
+                found[key] = value
+                self.hits += 1
+
+            from_disk = self._read_disk(missing)
+
+            for key, value in from_disk.items():
+                self._remember(key, value)
+                found[key] = value
+
+            self.disk_hits += len(from_disk)
+            self.misses += len(missing) - len(from_disk)
+
+        return found
+
+    def put_many(self, items: dict):
+
+        with self._lock:
+
+            for key, value in items.items():
+                self._remember(key, value)
+
+            self._write_disk(items)
+
+    def stats(self) -> dict:
+
+        with self._lock:
+            return {
+                "entries": len(self._memory),
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+            }
+
+    def clear(self):
+
+        with self._lock:
+
+            self._memory.clear()
+
+            db = self._connect()
+            if db is not None:
+                with db:
+                    db.execute("DELETE FROM phonemes")
+
+    # ------------------------------------------------------
+    # Internos
+    # ------------------------------------------------------
+    def _remember(self, key, value):
+
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _connect(self):
+
+        if self._db is not None:
+            return self._db
+
+        try:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+            db = sqlite3.connect(str(self.db_path), check_same_thread=False)
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS phonemes ("
+                " language TEXT, converter TEXT, syllable TEXT, phonemes TEXT,"
+                " PRIMARY KEY (language, converter, syllable))"
+            )
+            db.commit()
+
+        except sqlite3.Error as e:
+            # sin disco la caché sigue funcionando solo en memoria
+            print("Caché de fonemas en disco no disponible:", e)
+            self.db_path = None
+            return None
+
+        self._db = db
+        return db
+
+    def _read_disk(self, keys: list[tuple]) -> dict:
+
+        if not keys or self.db_path is None:
+            return {}
+
+        db = self._connect()
+        if db is None:
+            return {}
+
+        found = {}
+
+        # las claves de una misma llamada comparten idioma y conversor
+        by_group = {}
+        for language, converter, syllable in keys:
+            by_group.setdefault((language, converter), []).append(syllable)
+
+        try:
+            for (language, converter), syllables in by_group.items():
+                for i in range(0, len(syllables), _SQL_CHUNK):
+
+                    chunk = syllables[i:i + _SQL_CHUNK]
+                    marks = ",".join("?" * len(chunk))
+
+                    rows = db.execute(
+                        "SELECT syllable, phonemes FROM phonemes"
+                        f" WHERE language = ? AND converter = ? AND syllable IN ({marks})",
+                        [language, converter, *chunk],
+                    )
+
+                    for syllable, phonemes in rows:
+                        found[(language, converter, syllable)] = json.loads(phonemes)
+
+        except sqlite3.Error as e:
+            print("Error leyendo la caché de fonemas:", e)
+
+        return found
+
+    def _write_disk(self, items: dict):
+
+        if not items or self.db_path is None:
+            return
+
+        db = self._connect()
+        if db is None:
+            return
+
+        try:
+            with db:
+                db.executemany(
+                    "INSERT OR REPLACE INTO phonemes VALUES (?, ?, ?, ?)",
+                    [
+                        (language, converter, syllable, json.dumps(value, ensure_ascii=False))
+                        for (language, converter, syllable), value in items.items()
+                    ],
+                )
+        except sqlite3.Error as e:
+            print("Error guardando la caché de fonemas:", e)
+
+
+_cache = PhonemeCache(PHONEME_CACHE_PATH, PHONEME_CACHE_MAX_ENTRIES)
+
+
+def get_phoneme_cache_stats() -> dict:
+    return _cache.stats()
+
+
+def clear_phoneme_cache():
+    _cache.clear()
+
+
+# ==========================================================
+# Conversor con caché
+# ==========================================================
+class CachedPhonemeConverter(BasePhonemeConverter):
+    """
+    Envuelve otro conversor y solo le pide las sílabas que no
+    estén ya en la caché (cada una una sola vez).
+    """
+
+    def __init__(self, inner: BasePhonemeConverter, language_code: str):
+        self.inner = inner
+        self.language_code = language_code
+
+        self.converter_key = f"{type(inner).__name__}:{inner.cache_version}"
+
+    def convert(self, syllable: str) -> list[str]:
+        return self.convert_many([syllable])[0]
+
+    def convert_many(self, syllables: list[str]) -> list[list[str]]:
+
+        normalized = [normalize_syllable(syl) for syl in syllables]
+
+        keys = list(dict.fromkeys(
+            (self.language_code, self.converter_key, syl)
+            for syl in normalized
+        ))
+
+        found = _cache.get_many(keys)
+
+        missing = [key for key in keys if key not in found]
+
+        if missing:
+
+            converted = self.inner.convert_many([key[2] for key in missing])
+
+            new_items = dict(zip(missing, converted))
+            found.update(new_items)
+
+            # los errores del conversor no se guardan
+            _cache.put_many({
+                key: value
+                for key, value in new_items.items()
+                if not any(token.startswith("[error:") for token in value)
+            })
+
+        return [
+            list(found[(self.language_code, self.converter_key, syl)])
+            for syl in normalized
+        ]
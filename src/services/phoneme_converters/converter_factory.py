@@ -1,4 +1,7 @@
-from .espeak_converter import EspeakConverter
+from .espeak_pool import PooledEspeakConverter
+from .cached_converter import CachedPhonemeConverter
+from .spanish_converter import SpanishConverter
+from .latin_converter import LatinConverter
 from .basque_converter import BasqueConverter
 
 
@@ -31,10 +34,19 @@ def get_converter(language: str):
         "Turco": "tr",
     }
 
+    # Idiomas con reglas propias: sin procesos externos ni caché
+    # (convertir es más rápido que consultar SQLite)
+    if language == "Español":
+        return SpanishConverter()
+
+    if language == "Latín":
+        return LatinConverter()
+
     if language == "Euskera":
-        return BasqueConverter()
+        return CachedPhonemeConverter(BasqueConverter(), "eu")
 
     if language in mapping:
-        return EspeakConverter(mapping[language])
+        code = mapping[language]
+        return CachedPhonemeConverter(PooledEspeakConverter(code), code)
 
-    return EspeakConverter("en")  # fallback
\ No newline at end of file
+    return CachedPhonemeConverter(PooledEspeakConverter("en"), "en")  # fallback
\ No newline at end of file
@@ -1,14 +1,16 @@
 import subprocess
 from .base_converter import BasePhonemeConverter
 
+from config.config import ESPEAK_PATH
+
 
 class EspeakConverter(BasePhonemeConverter):
 
     def __init__(self, language_code: str):
         self.language_code = language_code
 
-        # Ruta a tu espeak
-        self.espeak_path = r"C:\Program Files (x86)\eSpeak\command_line\espeak.exe"
+        # Ruta a tu espeak (config.ESPEAK_PATH)
+        self.espeak_path = str(ESPEAK_PATH)
 
     def convert(self, syllable: str) -> list[str]:
 
@@ -53,6 +55,92 @@ class EspeakConverter(BasePhonemeConverter):
         except Exception as e:
             return [f"[error:{e}]"]
 
+    # ======================================================
+    # Conversión por lotes
+    # ======================================================
+    def convert_many(self, syllables: list[str]) -> list[list[str]]:
+        """
+        Convierte todas las sílabas con una sola llamada a eSpeak.
+
+        Cada sílaba va en su propia línea terminada en punto, así eSpeak
+        la trata como una frase y devuelve una línea de IPA por sílaba.
+        Si el número de líneas no cuadra, el lote se parte en dos y se
+        repite hasta aislar las sílabas problemáticas.
+        """
+
+        results = [[] for _ in syllables]
+
+        pending = []
+
+        for i, syl in enumerate(syllables):
+
+            text = self._clean_for_batch(syl)
+
+            # sílabas sin letras ("-", "!"...) no producen fonemas
+            if text:
+                pending.append((i, text))
+
+        self._convert_batch(pending, results)
+
+        return results
+
+    def _convert_batch(self, batch: list[tuple[int, str]], results: list):
+
+        if not batch:
+            return
+
+        if len(batch) == 1:
+            i, text = batch[0]
+            results[i] = self.convert(text)
+            return
+
+        lines = self._run_batch([text for _, text in batch])
+
+        if lines is not None and len(lines) == len(batch):
+            for (i, _), line in zip(batch, lines):
+                results[i] = self._normalize(line)
+            return
+
+        middle = len(batch) // 2
+
+        self._convert_batch(batch[:middle], results)
+        self._convert_batch(batch[middle:], results)
+
+    def _run_batch(self, texts: list[str]) -> list[str] | None:
+
+        stdin_text = "".join(f"{text}.\n" for text in texts)
+
+        try:
+            result = subprocess.run(
+                [
+                    self.espeak_path,
+                    "-q",          # sin audio
+                    "--ipa",       # salida IPA
+                    "-b", "1",     # entrada en UTF-8
+                    "-v", self.language_code,
+                    "--stdin",
+                ],
+                input=stdin_text,
+                capture_output=True,
+                text=True,
+                encoding="utf-8",
+                errors="ignore"
+            )
+        except Exception:
+            return None
+
+        return [line for line in result.stdout.splitlines() if line.strip()]
+
+    def _clean_for_batch(self, syllable: str) -> str:
+        """
+        Deja solo letras y apóstrofos: una coma o un punto dentro
+        de la sílaba partiría su línea de salida en dos.
+        """
+
+        syllable = syllable.replace("_", "")
+
+        return "".join(c for c in syllable if c.isalpha() or c in "'’")
+
     """
     def _normalize(self, phoneme_str: str) -> list[str]:
         return list(phoneme_str.replace(" ", ""))
@@ -0,0 +1,233 @@
+"""
+Pool persistente de procesos de fonemización con eSpeak.
+
+Cada idioma tiene N procesos vivos durante toda la sesión. Cada proceso
+carga libespeak-ng una sola vez (o, si no está instalada, usa el
+ejecutable en modo por lotes) y recibe listas de sílabas por una
+tubería (multiprocessing.Pipe):
+
+sílabas
+  ↓
+trozos contiguos, uno por proceso
+  ↓
+convert_many en cada proceso (en paralelo)
+  ↓
+resultados en el orden original
+
+Así el visor de fonemas, las voces cantadas y cualquier vista previa
+comparten los mismos procesos y no vuelven a arrancar eSpeak.
+"""
+
+import atexit
+import multiprocessing
+import threading
+
+from .base_converter import BasePhonemeConverter
+from .espeak_converter import EspeakConverter
+
+from config.config import PHONEMIZER_WORKERS
+
+# Sílabas mínimas por proceso: con menos no compensa repartir
+_MIN_CHUNK = 32
+
+_JOIN_TIMEOUT = 2.0
+
+
+# ==========================================================
+# Proceso trabajador
+# ==========================================================
+def _create_backend(language_code: str):
+
+    from .libespeak_converter import LibEspeakConverter, load_libespeak
+
+    lib = load_libespeak()
+
+    if lib is not None:
+        try:
+            return LibEspeakConverter(language_code, lib)
+        except RuntimeError:
+            pass
+
+    return EspeakConverter(language_code)
+
+
+def _worker_main(conn, language_code: str):
+    """
+    Bucle del proceso: recibe una lista de sílabas, devuelve sus
+    fonemas. None (o cerrar la tubería) termina el proceso.
+    """
+
+    backend = _create_backend(language_code)
+
+    while True:
+
+        try:
+            request = conn.recv()
+        except (EOFError, OSError):
+            break
+
+        if request is None:
+            break
+
+        try:
+            response = backend.convert_many(request)
+        except Exception as e:
+            response = [[f"[error:{e}]"] for _ in request]
+
+        conn.send(response)
+
+    conn.close()
+
+
+# ==========================================================
+# Pool por idioma
+# ==========================================================
+class EspeakWorkerPool:
+
+    def __init__(self, language_code: str, workers: int):
+        self.language_code = language_code
+        self.n_workers = max(1, workers)
+
+        self._workers = []
+        self._lock = threading.Lock()
+
+    def start(self):
+
+        with self._lock:
+            self._start()
+
+    def _start(self):
+
+        if self._workers:
+            return
+
+        ctx = multiprocessing.get_context("spawn")
+
+        for _ in range(self.n_workers):
+
+            parent_conn, child_conn = ctx.Pipe()
+
+            process = ctx.Process(
+                target=_worker_main,
+                args=(child_conn, self.language_code),
+                daemon=True,
+            )
+            process.start()
+
+            child_conn.close()
+
+            self._workers.append((process, parent_conn))
+
+    def convert_many(self, syllables: list[str]) -> list[list[str]]:
+
+        if not syllables:
+            return []
+
+        with self._lock:
+
+            self._start()
+
+            n_chunks = min(
+                len(self._workers),
+                max(1, len(syllables) // _MIN_CHUNK),
+            )
+
+            size = -(-len(syllables) // n_chunks)
+            chunks = [syllables[i:i + size] for i in range(0, len(syllables), size)]
+
+            try:
+                for (_, conn), chunk in zip(self._workers, chunks):
+                    conn.send(chunk)
+
+                results = []
+
+                for (_, conn), _chunk in zip(self._workers, chunks):
+                    results.extend(conn.recv())
+
+                return results
+
+            except (EOFError, OSError, BrokenPipeError):
+                # un proceso ha muerto: se reinicia el pool en la
+                # siguiente llamada y esta se resuelve en local
+                self._stop()
+
+        return EspeakConverter(self.language_code).convert_many(syllables)
+
+    def shutdown(self):
+
+        with self._lock:
+            self._stop()
+
+    def _stop(self):
+
+        for process, conn in self._workers:
+            try:
+                conn.send(None)
+            except (OSError, BrokenPipeError):
+                pass
+
+        for process, conn in self._workers:
+            process.join(_JOIN_TIMEOUT)
+
+            if process.is_alive():
+                process.terminate()
+
+            conn.close()
+
+        self._workers = []
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(language_code: str) -> EspeakWorkerPool:
+    """
+    Devuelve el pool del idioma, arrancando sus procesos la primera vez.
+    """
+
+    with _pools_lock:
+
+        pool = _pools.get(language_code)
+
+        if pool is None:
+            pool = EspeakWorkerPool(language_code, PHONEMIZER_WORKERS)
+            pool.start()
+            _pools[language_code] = pool
+
+        return pool
+
+
+def shutdown_pools():
+    """
+    Cierra todos los procesos de fonemización.
+    Se registra con atexit; también puede llamarse al cerrar la ventana.
+    """
+
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+
+    for pool in pools:
+        pool.shutdown()
+
+
+atexit.register(shutdown_pools)
+
+
+# ==========================================================
+# Conversor
+# ==========================================================
+class PooledEspeakConverter(BasePhonemeConverter):
+    """
+    Conversor que delega en el pool persistente del idioma.
+    """
+
+    def __init__(self, language_code: str):
+        self.language_code = language_code
+
+    def convert(self, syllable: str) -> list[str]:
+        return self.convert_many([syllable])[0]
+
+    def convert_many(self, syllables: list[str]) -> list[list[str]]:
+        return get_pool(self.language_code).convert_many(list(syllables))
@@ -0,0 +1,77 @@
+from .rule_converter import RuleBasedConverter
+
+_VOWEL = "[aeiouyáéíóúæœ]"
+
+
+class LatinConverter(RuleBasedConverter):
+    """
+    Latín eclesiástico (pronunciación italiana, la habitual en coro).
+    """
+
+    RULES = {
+        # vocales y diptongos
+        "a": "a", "á": "a",
+        "e": "e", "é": "e", "ë": "e",
+        "i": "i", "í": "i", "ï": "i",
+        "o": "o", "ó": "o",
+        "u": "u", "ú": "u",
+        "y": "i",
+        "ae": "e", "æ": "e",
+        "oe": "e", "œ": "e",
+
+        # c ante e, i, ae, oe, y → tʃ
+        "c": "k",
+        "ce": "tʃ e", "ci": "tʃ i", "cy": "tʃ i",
+        "cae": "tʃ e", "coe": "tʃ e", "cæ": "tʃ e", "cœ": "tʃ e",
+        "cce": "t tʃ e", "cci": "t tʃ i",
+        "ch": "k",
+
+        # sc ante e, i → ʃ
+        "sce": "ʃ e", "sci": "ʃ i", "scae": "ʃ e", "scæ": "ʃ e",
+
+        # x ante c suave
+        "x": "k s",
+        "xce": "k ʃ e", "xci": "k ʃ i",
+
+        # g ante e, i, ae, oe, y → dʒ
+        "g": "g",
+        "ge": "dʒ e", "gi": "dʒ i", "gy": "dʒ i",
+        "gae": "dʒ e", "goe": "dʒ e", "gæ": "dʒ e", "gœ": "dʒ e",
+        "gn": "ɲ",
+        "gua": "g w a", "gue": "g w e", "gui": "g w i", "guo": "g w o",
+
+        # qu
+        "qu": "k w",
+        "q": "k",
+
+        # grafías griegas y h muda
+        "ph": "f",
+        "th": "t",
+        "rh": "r",
+        "h": "",
+
+        # resto de consonantes
+        "b": "b",
+        "d": "d",
+        "f": "f",
+        "j": "j",
+        "k": "k",
+        "l": "l",
+        "m": "m",
+        "n": "n",
+        "p": "p",
+        "r": "r",
+        "s": "s",
+        "t": "t",
+        "v": "v",
+        "w": "v",
+        "z": "dz",
+    }
+
+    CONTEXT_RULES = [
+        # ti + vocal → tsi, salvo tras s, t, x ("gratia", pero "hostia")
+        ("ti", "^|[^stx]", _VOWEL, "ts i"),
+
+        # h entre íes → k ("mihi", "nihil")
+        ("h", "i", "i", "k"),
+    ]
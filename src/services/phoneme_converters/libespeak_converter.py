@@ -0,0 +1,96 @@
+import ctypes
+import ctypes.util
+
+from .espeak_converter import EspeakConverter
+
+from config.config import ESPEAK_LIBRARY_PATH
+
+# Constantes de speak_lib.h
+AUDIO_OUTPUT_RETRIEVAL = 1
+ESPEAK_CHARS_UTF8 = 1
+PHONEMES_IPA = 0x02
+
+
+def load_libespeak():
+    """
+    Carga libespeak-ng o devuelve None si no está instalada.
+    """
+
+    candidates = [str(ESPEAK_LIBRARY_PATH)]
+
+    found = ctypes.util.find_library("espeak-ng")
+    if found:
+        candidates.append(found)
+
+    candidates += ["libespeak-ng.so.1", "libespeak-ng.dylib"]
+
+    for name in candidates:
+        try:
+            lib = ctypes.CDLL(name)
+        except OSError:
+            continue
+
+        lib.espeak_Initialize.restype = ctypes.c_int
+        lib.espeak_Initialize.argtypes = [
+            ctypes.c_int, ctypes.c_int, ctypes.c_char_p, ctypes.c_int,
+        ]
+
+        lib.espeak_SetVoiceByName.restype = ctypes.c_int
+        lib.espeak_SetVoiceByName.argtypes = [ctypes.c_char_p]
+
+        lib.espeak_TextToPhonemes.restype = ctypes.c_char_p
+        lib.espeak_TextToPhonemes.argtypes = [
+            ctypes.POINTER(ctypes.c_void_p), ctypes.c_int, ctypes.c_int,
+        ]
+
+        return lib
+
+    return None
+
+
+class LibEspeakConverter(EspeakConverter):
+    """
+    Conversor que llama a libespeak-ng en el propio proceso.
+
+    No arranca ningún ejecutable: cada sílaba es una llamada a
+    espeak_TextToPhonemes. La biblioteca no es reentrante, así que
+    cada proceso debe tener una sola instancia (ver espeak_pool).
+    """
+
+    def __init__(self, language_code: str, lib):
+        super().__init__(language_code)
+
+        self.lib = lib
+
+        if lib.espeak_Initialize(AUDIO_OUTPUT_RETRIEVAL, 0, None, 0) < 0:
+            raise RuntimeError("No se pudo inicializar libespeak-ng")
+
+        if lib.espeak_SetVoiceByName(language_code.encode("utf-8")) != 0:
+            raise RuntimeError(f"Voz de eSpeak no disponible: {language_code}")
+
+    def convert(self, syllable: str) -> list[str]:
+
+        text = self._clean_for_batch(syllable)
+
+        if not text:
+            return []
+
+        buffer = ctypes.create_string_buffer(text.encode("utf-8"))
+        text_ptr = ctypes.c_void_p(ctypes.addressof(buffer))
+
+        clauses = []
+
+        # espeak_TextToPhonemes devuelve una cláusula por llamada
+        # y avanza text_ptr hasta dejarlo a NULL
+        while text_ptr.value:
+            phonemes = self.lib.espeak_TextToPhonemes(
+                ctypes.byref(text_ptr), ESPEAK_CHARS_UTF8, PHONEMES_IPA
+            )
+
+            if phonemes:
+                clauses.append(phonemes.decode("utf-8", errors="ignore"))
+
+        return self._normalize(" ".join(clauses))
+
+    def convert_many(self, syllables: list[str]) -> list[list[str]]:
+        return [self.convert(syl) for syl in syllables]
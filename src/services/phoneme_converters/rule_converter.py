@@ -0,0 +1,196 @@
+import re
+import unicodedata
+
+from .base_converter import BasePhonemeConverter
+
+
+class RuleTable:
+    """
+    Tabla grafema → fonemas compilada para búsqueda de la
+    coincidencia más larga.
+
+    Las reglas se escriben como {"grafema": "f o n e m a s"} (fonemas
+    separados por espacios, "" para letras mudas). Al compilar, los
+    grafemas se organizan en un trie y el trie se traduce a una única
+    expresión regular con grupos opcionales voraces: en cada posición
+    gana la regla más larga y el recorrido lo hace el motor de re (en C).
+
+    Las reglas de contexto son tuplas (grafema, antes, después, fonemas):
+    antes / después son expresiones regulares que deben cumplirse justo
+    antes y justo después del grafema ("^" inicio y "$" final de la
+    palabra, None sin condición). Se prueban en orden y tienen prioridad
+    sobre la regla sin contexto del mismo grafema; si ninguna se cumple
+    y el grafema no tiene regla general, se prueba el grafema más corto.
+    """
+
+    def __init__(self, rules: dict, context_rules: list | None = None):
+
+        self.rules = {
+            grapheme: tuple(phonemes.split())
+            for grapheme, phonemes in rules.items()
+        }
+
+        self.context_rules = {}
+
+        for grapheme, before, after, phonemes in context_rules or []:
+            self.context_rules.setdefault(grapheme, []).append((
+                re.compile(f"(?:{before})$") if before else None,
+                re.compile(after) if after else None,
+                tuple(phonemes.split()),
+            ))
+
+        trie = {}
+
+        for grapheme in (*self.rules, *self.context_rules):
+
+            node = trie
+            for char in grapheme:
+                node = node.setdefault(char, {})
+
+            node[""] = True
+
+        # "." al final: cualquier carácter sin regla pasa tal cual
+        self._pattern = re.compile(_trie_pattern(trie) + "|.", re.DOTALL)
+
+        self._memo = {}
+
+    def transcribe(self, text: str) -> list[str]:
+
+        result = self._memo.get(text)
+
+        if result is None:
+
+            if self.context_rules:
+                result = self._transcribe_with_context(text)
+            else:
+                result = []
+
+                for grapheme in self._pattern.findall(text):
+                    result.extend(self.rules.get(grapheme, (grapheme,)))
+
+            self._memo[text] = result
+
+        return list(result)
+
+    def _transcribe_with_context(self, text: str) -> list[str]:
+
+        result = []
+
+        pos = 0
+        while pos < len(text):
+
+            length = self._pattern.match(text, pos).end() - pos
+
+            # de la coincidencia más larga a la más corta
+            for size in range(length, 0, -1):
+
+                phonemes = self._resolve(text, pos, pos + size)
+
+                if phonemes is not None:
+                    break
+            else:
+                size, phonemes = 1, (text[pos],)
+
+            result.extend(phonemes)
+            pos += size
+
+        return result
+
+    def _resolve(self, text: str, start: int, end: int):
+
+        grapheme = text[start:end]
+
+        for before, after, phonemes in self.context_rules.get(grapheme, ()):
+
+            if before is not None and not before.search(text, 0, start):
+                continue
+
+            if after is not None and not after.match(text, end):
+                continue
+
+            return phonemes
+
+        return self.rules.get(grapheme)
+
+
+def _trie_pattern(node: dict) -> str:
+    """
+    Expresión regular equivalente a un nodo del trie.
+    Si el nodo cierra un grafema, la continuación es opcional.
+    """
+
+    branches = [
+        re.escape(char) + _trie_pattern(child)
+        for char, child in sorted(node.items())
+        if char
+    ]
+
+    if not branches:
+        return ""
+
+    pattern = "(?:" + "|".join(branches) + ")"
+
+    if "" in node:
+        pattern += "?"
+
+    return pattern
+
+
+def _clean(syllable: str) -> str:
+    text = unicodedata.normalize("NFC", syllable).lower()
+    return "".join(c for c in text if c.isalpha())
+
+
+class RuleBasedConverter(BasePhonemeConverter):
+    """
+    Conversor por reglas ortográficas, sin procesos externos.
+
+    Cada idioma define RULES (y opcionalmente CONTEXT_RULES); la tabla
+    se compila una sola vez, al definir la subclase (al importar).
+    """
+
+    RULES: dict = {}
+    CONTEXT_RULES: list = []
+
+    table: RuleTable = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.table = RuleTable(cls.RULES, cls.CONTEXT_RULES)
+
+    def __init__(self):
+        # sílaba tal cual llega → fonemas (evita normalizar repetidas)
+        self._converted = {}
+
+    def convert(self, syllable: str) -> list[str]:
+
+        text = _clean(syllable)
+
+        if not text:
+            return []
+
+        return self.table.transcribe(text)
+
+    def convert_many(self, syllables: list[str]) -> list[list[str]]:
+        """
+        Convierte todas las sílabas de una parte con la tabla ya
+        compilada: sin preparación por llamada y cada sílaba
+        distinta una sola vez.
+        """
+
+        converted = self._converted
+        transcribe = self.table.transcribe
+
+        result = []
+
+        for syl in syllables:
+
+            tokens = converted.get(syl)
+
+            if tokens is None:
+                text = _clean(syl)
+                tokens = converted[syl] = transcribe(text) if text else []
+
+            result.append(list(tokens))
+
+        return result
@@ -0,0 +1,69 @@
+from .rule_converter import RuleBasedConverter
+
+_VOWEL = "[aeiouáéíóúü]"
+
+
+class SpanishConverter(RuleBasedConverter):
+    """
+    Español peninsular (con distinción c/z → θ).
+    """
+
+    RULES = {
+        # vocales
+        "a": "a", "á": "a",
+        "e": "e", "é": "e",
+        "i": "i", "í": "i",
+        "o": "o", "ó": "o",
+        "u": "u", "ú": "u", "ü": "w",
+
+        # c / z
+        "c": "k",
+        "ce": "θ e", "cé": "θ e",
+        "ci": "θ i", "cí": "θ i",
+        "z": "θ",
+        "ch": "tʃ",
+
+        # g / j
+        "g": "g",
+        "ge": "x e", "gé": "x e",
+        "gi": "x i", "gí": "x i",
+        "gue": "g e", "gué": "g e",
+        "gui": "g i", "guí": "g i",
+        "j": "x",
+
+        # qu
+        "que": "k e", "qué": "k e",
+        "qui": "k i", "quí": "k i",
+        "q": "k",
+
+        # y: vocal salvo ante vocal (ver CONTEXT_RULES)
+        "y": "i",
+
+        # resto de consonantes
+        "b": "b", "v": "b",
+        "d": "d",
+        "f": "f",
+        "h": "",
+        "k": "k",
+        "l": "l",
+        "ll": "ʎ",
+        "m": "m",
+        "n": "n",
+        "ñ": "ɲ",
+        "p": "p",
+        "r": "ɾ",
+        "rr": "r",
+        "s": "s",
+        "t": "t",
+        "w": "w",
+        "x": "k s",
+    }
+
+    CONTEXT_RULES = [
+        # y ante vocal → consonante ("ya", "hoyo")
+        ("y", None, _VOWEL, "ʝ"),
+
+        # r inicial o tras l, n, s → vibrante múltiple ("rosa", "honra")
+        ("r", "^", None, "r"),
+        ("r", "[lns]", None, "r"),
+    ]
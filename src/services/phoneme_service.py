@@ -1,36 +1,183 @@
 from pathlib import Path
-from services.coral_parser_service import extract_syllables_by_part
+from services.coral_parser_service import extract_words_by_part
+from services.syllable_alignment_service import align_word_ipa
 
 from services.phoneme_converters.converter_factory import get_converter
+from services.phoneme_converters.cached_converter import normalize_syllable
 
 # ==========================================================
 # Conversión completa por voces
 # ==========================================================
-def extract_phonemes_by_part(xml_path: Path, language: str) -> dict:
+def extract_phonemes_by_part(xml_path: Path, language: str, log=None) -> dict:
+    """
+    Fonemas de cada sílaba, por voz.
 
-    syllables_by_part = extract_syllables_by_part(xml_path)
+    Las sílabas se agrupan en palabras (syllabic del MusicXML) y se
+    convierte cada palabra distinta una sola vez: el conversor tiene
+    así el contexto de la palabra entera. Después el IPA se reparte
+    entre las sílabas; las palabras que no se pueden alinear se
+    convierten sílaba a sílaba.
+    """
+
+    words_by_part = extract_words_by_part(xml_path)
 
     converter = get_converter(language)
 
-    phonemes_by_part = {}
+    results = _phonemize_word_groups(converter, list(words_by_part.values()), log=log)
+
+    return dict(zip(words_by_part, results))
+
+
+# ==========================================================
+# Conversión progresiva (para la interfaz)
+# ==========================================================
+def iter_phonemes_by_part(
+    xml_path: Path,
+    language: str,
+    chunk_words: int = 64,
+    cancel_event=None
+):
+    """
+    Generador: convierte voz a voz y, dentro de cada voz, por trozos
+    de chunk_words palabras, para ir mostrando resultados.
+
+    Produce tuplas (voz, elementos, sílabas hechas, sílabas totales).
+    La primera tupla de cada voz llega con elementos vacíos.
+    Si cancel_event se activa, deja de convertir en el siguiente trozo.
+
+    Las palabras repetidas entre trozos y voces no se vuelven a
+    convertir: las resuelven las cachés de los conversores.
+    """
+
+    words_by_part = extract_words_by_part(xml_path)
+
+    converter = get_converter(language)
+
+    total = sum(len(word) for words in words_by_part.values() for word in words)
+    done = 0
+
+    for part, words in words_by_part.items():
+
+        yield part, [], done, total
+
+        for start in range(0, len(words), chunk_words):
+
+            if cancel_event is not None and cancel_event.is_set():
+                return
+
+            items = _phonemize_word_groups(converter, [words[start:start + chunk_words]])[0]
+
+            done += len(items)
+
+            yield part, items, done, total
+
+
+# ==========================================================
+# Núcleo: palabras → fonemas por sílaba
+# ==========================================================
+def _phonemize_word_groups(converter, groups: list, log=None) -> list:
+    """
+    groups: listas de palabras (una por voz o por trozo).
+    Devuelve, para cada grupo, la lista de {"syllable", "phonemes"}.
+    """
+
+    # ------------------------------------------------------
+    # Palabras únicas de todos los grupos
+    # ------------------------------------------------------
+    # En escritura homofónica las voces cantan casi el mismo texto:
+    # cada palabra distinta se convierte una sola vez para todas ellas
+    unique_words = {}
+
+    for words in groups:
+        for word in words:
+            unique_words.setdefault(_word_key(word), word)
 
-    for part, syllables in syllables_by_part.items():
+    word_texts = {key: _word_text(key) for key in unique_words}
+
+    texts = list(dict.fromkeys(text for text in word_texts.values() if text))
+
+    total = sum(len(word) for words in groups for word in words)
+
+    if log:
+        log(f"🔤 {total} sílabas, {len(texts)} palabras únicas para convertir a fonemas")
+
+    # una sola llamada al conversor (el pool la reparte entre procesos)
+    ipa_by_text = {
+        text: "".join(tokens)
+        for text, tokens in zip(texts, converter.convert_many(texts))
+    }
+
+    # ------------------------------------------------------
+    # Reparto del IPA de cada palabra entre sus sílabas
+    # ------------------------------------------------------
+    aligned_words = {}
+    fallback = {}
+
+    for key, text in word_texts.items():
+
+        if not text:
+            aligned_words[key] = [""] * len(key)
+            continue
+
+        aligned = align_word_ipa(list(key), ipa_by_text[text])
+
+        if aligned is None:
+            for syl in key:
+                fallback[syl] = None
+        else:
+            aligned_words[key] = aligned
+
+    if fallback:
+
+        if log:
+            log(f"  {len(fallback)} sílabas sin alinear se convierten por separado")
+
+        syllables = list(fallback)
+
+        for syl, tokens in zip(syllables, converter.convert_many(syllables)):
+            fallback[syl] = tokens
+
+    # ------------------------------------------------------
+    # Reparto a cada grupo
+    # ------------------------------------------------------
+    results = []
+
+    for words in groups:
 
         result = []
 
-        for syl in syllables:
+        for word in words:
+
+            key = _word_key(word)
+            aligned = aligned_words.get(key)
+
+            for i, syl in enumerate(word):
+
+                if aligned is not None:
+                    tokens = [aligned[i]] if aligned[i] else []
+                else:
+                    tokens = fallback[key[i]]
+
+                result.append({
+                    "syllable": syl,
+                    "phonemes": _split_ipa_tokens(tokens)
+                })
+
+        results.append(result)
+
+    return results
 
-            tokens = converter.convert(syl)
-            tokens = _split_ipa_tokens(tokens)
 
-            result.append({
-                "syllable": syl,
-                "phonemes": tokens
-            })
+def _word_key(word: list[str]) -> tuple:
+    return tuple(normalize_syllable(syl) for syl in word)
 
-        phonemes_by_part[part] = result
 
-    return phonemes_by_part
+def _word_text(key: tuple) -> str:
+    """
+    Texto de la palabra para el conversor: solo letras y apóstrofos
+    (se quitan guiones, puntuación y guiones blandos de las sílabas).
+    """
+    return "".join(c for syl in key for c in syl if c.isalpha() or c in "'’")
 
 # ==========================================================
 # Separar IPA en fonemas individuales
@@ -4,6 +4,8 @@ from pathlib import Path
 import tempfile
 import shutil
 
+import mido
+
 from services.coral_midi_service import export_selected_parts_to_midi
 from services.coral_audio_render_service import midi_to_wav
 
@@ -17,98 +19,15 @@ def get_reaper_resource_path():
     return Path.home() / "AppData" / "Roaming" / "REAPER"
 
 def get_midi_duration(midi_path: Path):
+    """
+    Duración del MIDI en segundos.
 
-    import struct
-
-    with open(midi_path, "rb") as f:
-
-        data = f.read()
-
-    pos = 0
-
-    # ==============================
-    # Leer header
-    # ==============================
-
-    if data[pos:pos+4] != b"MThd":
-        raise ValueError("Archivo MIDI inválido")
-
-    pos += 8  # saltar MThd + header length
-
-    format_type, n_tracks, division = struct.unpack(">HHH", data[pos:pos+6])
-    pos += 6
-
-    ticks_per_beat = division
-
-    tempo = 500000  # microsegundos por beat (120 BPM por defecto)
-
-    total_ticks = 0
-
-    # ==============================
-    # Leer tracks
-    # ==============================
-
-    for _ in range(n_tracks):
-
-        if data[pos:pos+4] != b"MTrk":
-            break
-
-        pos += 4
-
-        track_length = struct.unpack(">I", data[pos:pos+4])[0]
-        pos += 4
-
-        track_end = pos + track_length
-
-        track_ticks = 0
-
-        while pos < track_end:
-
-            # leer delta time (variable length)
-            delta = 0
-
-            while True:
-                byte = data[pos]
-                pos += 1
-                delta = (delta << 7) | (byte & 0x7F)
-                if not (byte & 0x80):
-                    break
-
-            track_ticks += delta
-
-            event = data[pos]
-            pos += 1
-
-            if event == 0xFF:  # meta event
-
-                meta_type = data[pos]
-                pos += 1
-
-                length = data[pos]
-                pos += 1
-
-                if meta_type == 0x51 and length == 3:
-                    tempo = int.from_bytes(data[pos:pos+3], "big")
-
-                pos += length
-
-            elif event in (0xF0, 0xF7):  # sysex
-                length = data[pos]
-                pos += 1 + length
-
-            else:
-                # evento MIDI normal (2 bytes más normalmente)
-                pos += 2
-
-        total_ticks = max(total_ticks, track_ticks)
-
-    # ==============================
-    # convertir ticks → segundos
-    # ==============================
-
-    seconds = (total_ticks * tempo) / (ticks_per_beat * 1_000_000)
+    mido recorre todos los set_tempo (la exportación emite uno por
+    cada cambio de tempo de la partitura, también con tempo forzado),
+    así que la duración es la real aunque el tempo cambie.
+    """
 
-    return seconds
+    return mido.MidiFile(midi_path).length
 
 def get_wav_duration(wav_path: Path):
 
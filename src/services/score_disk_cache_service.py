@@ -0,0 +1,146 @@
+"""
+Caché persistente en disco de partituras parseadas.
+
+Guarda el score de music21 congelado (StreamFreezer) en
+SCORE_DISK_CACHE_DIR, direccionado por el hash del contenido del
+archivo y la versión de music21. Así, al reiniciar la aplicación,
+una partitura ya abierta se recupera sin volver a parsear el MusicXML.
+"""
+
+import copy
+import os
+import threading
+from pathlib import Path
+
+import music21
+from music21 import freezeThaw
+
+from config.config import SCORE_DISK_CACHE_DIR, SCORE_DISK_CACHE_MAX_MB
+
+_pending = set()
+_pending_lock = threading.Lock()
+
+
+def _cache_path(content_hash: str) -> Path:
+    return SCORE_DISK_CACHE_DIR / f"{content_hash}-m21-{music21.__version__}.p"
+
+
+# ==========================================================
+# Lectura
+# ==========================================================
+def load_cached_score(content_hash: str):
+    """
+    Devuelve el score guardado para ese hash o None si no existe
+    (o si el archivo de caché está dañado).
+    """
+
+    path = _cache_path(content_hash)
+
+    if not path.is_file():
+        return None
+
+    try:
+        thawer = freezeThaw.StreamThawer()
+        thawer.openStr(path.read_bytes())
+    except Exception:
+        path.unlink(missing_ok=True)
+        return None
+
+    # marcar como usado recientemente (para la expulsión LRU)
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+    return thawer.stream
+
+
+# ==========================================================
+# Escritura
+# ==========================================================
+def store_score_async(score, content_hash: str):
+    """
+    Guarda en segundo plano el score ya parseado en la caché.
+
+    StreamFreezer desmonta el stream que congela, así que el hilo
+    congela una copia (hecha aquí, antes de que el score se comparta)
+    en lugar de tocar el score compartido o volver a parsear.
+    """
+
+    if _cache_path(content_hash).is_file():
+        return
+
+    with _pending_lock:
+        if content_hash in _pending:
+            return
+        _pending.add(content_hash)
+
+    thread = threading.Thread(
+        target=_store_score,
+        args=(copy.deepcopy(score), content_hash),
+        daemon=True,
+    )
+    thread.start()
+
+
+def _store_score(score, content_hash: str):
+
+    try:
+        data = freezeThaw.StreamFreezer(score, fastButUnsafe=True).writeStr(fmt="pickle")
+
+        path = _cache_path(content_hash)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        # escribir en temporal y renombrar: nunca queda un archivo a medias
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+
+        _evict(keep=path)
+
+    except Exception as e:
+        print("Error guardando partitura en caché:", e)
+
+    finally:
+        with _pending_lock:
+            _pending.discard(content_hash)
+
+
+# ==========================================================
+# Expulsión por tamaño
+# ==========================================================
+def _evict(keep: Path):
+    """
+    Borra los archivos menos usados hasta quedar por debajo
+    de SCORE_DISK_CACHE_MAX_MB.
+    """
+
+    max_bytes = SCORE_DISK_CACHE_MAX_MB * 1024 * 1024
+
+    files = []
+
+    for path in SCORE_DISK_CACHE_DIR.glob("*.p"):
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+        files.append((stat.st_mtime, stat.st_size, path))
+
+    total = sum(size for _, size, _ in files)
+
+    for _, size, path in sorted(files):
+
+        if total <= max_bytes:
+            break
+
+        if path == keep:
+            continue
+
+        path.unlink(missing_ok=True)
+        total -= size
+
+
+def clear_score_disk_cache():
+
+    for path in SCORE_DISK_CACHE_DIR.glob("*.p"):
+        path.unlink(missing_ok=True)
@@ -0,0 +1,258 @@
+"""
+Repositorio de partituras parseadas.
+
+Mantiene en memoria los scores de music21 ya parseados para que una
+misma sesión coral (Analizar → MIDI → WAV → voces) no vuelva a llamar
+a converter.parse sobre el mismo archivo.
+
+Cada entrada se identifica por (ruta, tamaño, mtime, hash del contenido),
+de modo que si el archivo cambia en disco se vuelve a parsear.
+
+Si la partitura no está en memoria se busca antes en la caché de disco
+(score_disk_cache_service) y solo se parsea cuando tampoco está allí.
+"""
+
+import copy
+import hashlib
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+from config.config import SCORE_CACHE_MAX_ENTRIES, SCORE_CACHE_MAX_MB
+from services.score_disk_cache_service import load_cached_score, store_score_async
+from services.mxl_container_service import parse_score, uncompressed_size
+
+# Un score de music21 ocupa en memoria unas 20 veces el tamaño
+# del MusicXML sin comprimir (medido con tracemalloc)
+_MEMORY_FACTOR = 20
+
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+
+# ==========================================================
+# Huella del archivo
+# ==========================================================
+_hash_memo = {}
+_hash_lock = threading.Lock()
+
+
+def file_fingerprint(xml_path: Path) -> tuple:
+    """
+    Devuelve (ruta, tamaño, mtime, sha1) del archivo.
+
+    El hash solo se recalcula si cambian el tamaño o la fecha
+    de modificación.
+    """
+
+    path = Path(xml_path).resolve()
+    stat = path.stat()
+
+    memo_key = (str(path), stat.st_size, stat.st_mtime_ns)
+
+    with _hash_lock:
+        digest = _hash_memo.get(memo_key)
+
+    if digest is None:
+
+        sha = hashlib.sha1()
+
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(_HASH_CHUNK_SIZE), b""):
+                sha.update(chunk)
+
+        digest = sha.hexdigest()
+
+        with _hash_lock:
+            _hash_memo[memo_key] = digest
+
+    return memo_key + (digest,)
+
+
+def _estimate_memory(path: Path) -> int:
+    """
+    Estima la memoria que ocupará el score parseado.
+    """
+
+    try:
+        size = uncompressed_size(path)
+    except Exception:
+        size = path.stat().st_size
+
+    return size * _MEMORY_FACTOR
+
+
+# ==========================================================
+# Repositorio
+# ==========================================================
+class ScoreRepository:
+    """
+    Caché LRU de scores de music21 con límite de entradas y de memoria.
+
+    Los scores devueltos por get_score se comparten entre servicios y
+    deben tratarse como de solo lectura. Quien necesite modificarlos
+    (transponer en sitio, cambiar tempo, reescribir letra...) debe
+    pedir una copia con copy_score=True.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+
+        self.hits = 0
+        self.misses = 0
+
+    def get_score(self, xml_path: Path, copy_score: bool = False):
+
+        entry = self._get_entry(Path(xml_path))
+
+        if copy_score:
+            return copy.deepcopy(entry["score"])
+
+        return entry["score"]
+
+    def get_derived(self, xml_path: Path, name: str, builder):
+        """
+        Devuelve un dato derivado del score (índices, tablas...),
+        construyéndolo con builder(score) solo la primera vez.
+
+        Los datos derivados se descartan junto con el score.
+
+        builder se ejecuta fuera del lock del repositorio, con un lock
+        propio de ese dato: mientras se construye, el resto de
+        partituras y datos siguen disponibles y nadie lo construye dos
+        veces.
+        """
+
+        entry = self._get_entry(Path(xml_path))
+
+        with self._lock:
+            if name in entry["derived"]:
+                return entry["derived"][name]
+
+            name_lock = entry["derived_locks"].setdefault(name, threading.Lock())
+
+        with name_lock:
+
+            with self._lock:
+                if name in entry["derived"]:
+                    return entry["derived"][name]
+
+            value = builder(entry["score"])
+
+            with self._lock:
+                entry["derived"][name] = value
+
+            return value
+
+    def invalidate(self, xml_path: Path | None = None):
+
+        with self._lock:
+
+            if xml_path is None:
+                self._entries.clear()
+                return
+
+            path = str(Path(xml_path).resolve())
+
+            for key in [k for k in self._entries if k[0] == path]:
+                del self._entries[key]
+
+    def stats(self) -> dict:
+
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._total_bytes(),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    # ------------------------------------------------------
+    # Internos
+    # ------------------------------------------------------
+    def _get_entry(self, path: Path) -> dict:
+
+        key = file_fingerprint(path)
+
+        with self._lock:
+
+            entry = self._entries.get(key)
+
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+
+            self.misses += 1
+
+            # Versiones anteriores del mismo archivo ya no sirven
+            for old_key in [k for k in self._entries if k[0] == key[0]]:
+                del self._entries[old_key]
+
+            content_hash = key[3]
+
+            score = load_cached_score(content_hash)
+
+            if score is None:
+                score = parse_score(path)
+                store_score_async(score, content_hash)
+
+            entry = {
+                "score": score,
+                "size": _estimate_memory(path),
+                "derived": {},
+                "derived_locks": {},
+            }
+
+            self._entries[key] = entry
+            self._evict(keep=key)
+
+            return entry
+
+    def _total_bytes(self) -> int:
+        return sum(e["size"] for e in self._entries.values())
+
+    def _evict(self, keep):
+
+        while len(self._entries) > 1 and (
+            len(self._entries) > self.max_entries
+            or self._total_bytes() > self.max_bytes
+        ):
+            oldest = next(iter(self._entries))
+
+            if oldest == keep:
+                break
+
+            del self._entries[oldest]
+
+
+_repository = ScoreRepository(
+    max_entries=SCORE_CACHE_MAX_ENTRIES,
+    max_bytes=SCORE_CACHE_MAX_MB * 1024 * 1024,
+)
+
+
+def get_score(xml_path: Path, copy_score: bool = False):
+    """
+    Devuelve el score parseado de xml_path (compartido, solo lectura)
+    o una copia independiente si copy_score=True.
+    """
+    return _repository.get_score(xml_path, copy_score=copy_score)
+
+
+def get_derived(xml_path: Path, name: str, builder):
+    """
+    Devuelve builder(score) memorizado junto al score de xml_path.
+    """
+    return _repository.get_derived(xml_path, name, builder)
+
+
+def invalidate_score(xml_path: Path | None = None):
+    _repository.invalidate(xml_path)
+
+
+def get_cache_stats() -> dict:
+    return _repository.stats()
@@ -18,56 +18,47 @@ singing score (debug)
 """
 
 from pathlib import Path
-from music21 import converter
 
 from services.phoneme_service import extract_phonemes_by_part
+from services.coral_parser_service import get_score_index
+from services.f0_service import build_f0_contour, write_f0
+from models.note_table import NoteTable, AlignedVoice
+from models.tempo_map import TempoMap
+from config.config import (
+    F0_FRAME_RATE,
+    F0_PORTAMENTO_SECONDS,
+    F0_VIBRATO_DEPTH,
+    F0_VIBRATO_RATE,
+    F0_VIBRATO_DELAY,
+)
+
+# Silencios que rodean a la voz en el .lab (segundos)
+LAB_SILENCE_START = 0.2
+LAB_SILENCE_END = 0.3
+
+import numpy as np
 
 
 # ==========================================================
 # Extraer notas por voz
 # ==========================================================
 def extract_notes_by_part(xml_path: Path) -> dict:
+    """
+    NoteTable por voz con una nota por sílaba (las mismas filas que
+    dan extract_syllables_by_part), construida a partir del índice
+    de la partitura.
+    """
 
-    score = converter.parse(xml_path)
+    index = get_score_index(xml_path)
 
     notes_by_part = {}
-    voice_counter = {}
-
-    for part in score.parts:
-
-        part_name = part.partName.strip() if part.partName else part.id
-
-        # numerar voces duplicadas
-        if part_name not in voice_counter:
-            voice_counter[part_name] = 1
-        else:
-            voice_counter[part_name] += 1
-
-        voice_name = f"{part_name} {voice_counter[part_name]}"
-
-        notes = []
-
-        for note in part.recurse().notes:
-
-            if note.isRest:
-                continue
-
-            try:
-                pitch = note.pitch.midi
-            except Exception:
-                pitch = None
 
-            duration = float(note.quarterLength)
-            offset = float(note.offset)
+    for part in index.parts:
 
-            notes.append({
-                "pitch": pitch,
-                "duration": duration,
-                "offset": offset
-            })
+        sung = part.sung_notes()
 
-        if notes:
-            notes_by_part[voice_name] = notes
+        if sung:
+            notes_by_part[part.name] = NoteTable.from_rows(sung)
 
     return notes_by_part
 
@@ -75,44 +66,49 @@ def extract_notes_by_part(xml_path: Path) -> dict:
 # ==========================================================
 # Alinear notas y fonemas
 # ==========================================================
-def align_notes_and_phonemes(notes, phonemes):
+def align_notes_and_phonemes(notes: NoteTable, phonemes, tempo_map: TempoMap | None = None) -> AlignedVoice:
+    """
+    Empareja notas y fonemas y calcula sus tiempos en segundos.
 
-    aligned = []
+    notes debe tener una fila por sílaba (extract_notes_by_part),
+    de modo que la nota i lleva los fonemas de la sílaba i.
 
-    count = min(len(notes), len(phonemes))
+    Sin mapa de tempo se asume una negra por segundo (60 BPM).
+    """
 
-    current_time = 0.0
+    if tempo_map is None:
+        tempo_map = TempoMap.constant(60)
 
-    for i in range(count):
+    count = min(len(notes), len(phonemes))
 
-        note = notes[i]
-        phoneme_data = phonemes[i]
+    notes = notes[:count]
 
-        duration = note["duration"]
+    starts, ends = notes.seconds(tempo_map)
 
-        aligned.append({
-            "syllable": phoneme_data["syllable"],
-            "phonemes": phoneme_data["phonemes"],
-            "pitch": note["pitch"],
-            "duration": duration,
-            "offset": current_time
-        })
+    # voz monofónica: una nota no puede solaparse con la siguiente
+    if count > 1:
+        ends[:-1] = np.minimum(ends[:-1], starts[1:])
 
-        current_time += duration
+    return AlignedVoice(
+        notes=notes,
+        syllables=[item["syllable"] for item in phonemes[:count]],
+        phonemes=[item["phonemes"] for item in phonemes[:count]],
+        starts=starts,
+        ends=ends,
+    )
 
-    return aligned
 
 # ==========================================================
 # Guardar singing score
 # ==========================================================
-def save_singing_score(score, output_path: Path):
+def save_singing_score(score: AlignedVoice, output_path: Path):
 
     import json
 
     output_path.parent.mkdir(parents=True, exist_ok=True)
 
     with open(output_path, "w", encoding="utf-8") as f:
-        json.dump(score, f, indent=2, ensure_ascii=False)
+        json.dump(score.to_dicts(), f, indent=2, ensure_ascii=False)
 
 
 # ==========================================================
@@ -124,13 +120,14 @@ def generate_singing_voices(
     voice_models: dict,
     language: str,
     output_dir: Path,
+    tempo_bpm: int | None = None,
     log=None
 ):
 
     if log:
         log("Extrayendo fonemas por voz...")
 
-    phonemes_by_part = extract_phonemes_by_part(xml_path, language)
+    phonemes_by_part = extract_phonemes_by_part(xml_path, language, log=log)
 
     if log:
         log("Extrayendo notas por voz...")
@@ -140,25 +137,34 @@ def generate_singing_voices(
     if log:
         log("Alineando notas y fonemas...")
 
+    index = get_score_index(xml_path)
+
+    # un único mapa de tempo para .lab, F0 y singing_score.json
+    tempo_map = index.tempo_map.with_override(tempo_bpm)
+
     for part in selected_parts:
 
         part_name = part["name"]
         part_id = part["id"]
 
-        if part_name not in phonemes_by_part:
+        # el nombre de la interfaz es editable: buscar la voz por id
+        part_info = index.find_part(part_id)
+        voice_key = part_info.name if part_info else part_name
+
+        if voice_key not in phonemes_by_part:
             if log:
                 log(f"⚠ No hay fonemas para {part_name}")
             continue
 
-        if part_name not in notes_by_part:
+        if voice_key not in notes_by_part:
             if log:
                 log(f"⚠ No hay notas para {part_name}")
             continue
 
-        phonemes = phonemes_by_part[part_name]
-        notes = notes_by_part[part_name]
+        phonemes = phonemes_by_part[voice_key]
+        notes = notes_by_part[voice_key]
 
-        aligned = align_notes_and_phonemes(notes, phonemes)
+        aligned = align_notes_and_phonemes(notes, phonemes, tempo_map)
 
         model = voice_models.get(part_id, "Auto")
         part_dir = output_dir / part_name
@@ -172,6 +178,9 @@ def generate_singing_voices(
         f0_path = part_dir / "singing.f0"
         generate_f0_from_score(aligned, f0_path)
 
+        # log-F0 binario para modelos acústicos tipo NNSVS
+        generate_f0_from_score(aligned, part_dir / "singing_lf0.npy", unit="lf0")
+
         if log:
             log(f"🎤 Voz preparada: {part_name}")
             log(f"   Modelo: {model}")
@@ -185,95 +194,144 @@ def generate_singing_voices(
 # ==========================================================
 # Convertir score a label HTS (.lab)
 # ==========================================================
+def _hts_units(seconds):
+    """
+    Segundos → unidades HTS de 100 ns, redondeadas (no truncadas).
+    """
 
-def generate_lab_from_score(score, output_path):
+    units = np.rint(np.asarray(seconds, dtype=np.float64) * 10_000_000).astype(np.int64)
 
-    lines = []
+    return int(units) if units.ndim == 0 else units
 
-    time = 0.0
 
-    # silencio inicial
-    sil = 0.2
-    start = int(time * 10_000_000)
-    end = int((time + sil) * 10_000_000)
-    lines.append(f"{start} {end} sil")
-
-    time += sil
+def generate_lab_from_score(score: AlignedVoice, output_path):
 
     vowels = {"a","e","i","o","u","ɔ","ɛ","ɪ","ʊ","æ","ɑ","ɒ","ə","ɨ"}
 
-    for item in score:
-
-        phonemes = item["phonemes"]
-        duration = item["duration"]
+    # ------------------------------------------------------
+    # Aplanar fonemas: una entrada por fonema
+    # ------------------------------------------------------
+    counts = np.array([len(p) for p in score.phonemes], dtype=np.int64)
+    labels = [p for phonemes in score.phonemes for p in phonemes]
 
-        if len(phonemes) == 1:
+    syllable_idx = np.repeat(np.arange(len(counts)), counts)
+    is_vowel = np.array([p in vowels for p in labels], dtype=bool)
 
-            start = int(time * 10_000_000)
-            end = int((time + duration) * 10_000_000)
+    note_durations = (score.ends - score.starts)[syllable_idx]
 
-            lines.append(f"{start} {end} {phonemes[0]}")
+    # vocales y consonantes por sílaba
+    vowel_counts = np.bincount(syllable_idx, weights=is_vowel, minlength=len(counts))[syllable_idx]
+    consonant_counts = counts[syllable_idx] - vowel_counts
 
-            time += duration
+    # consonantes cortas (20 %), vocales largas (80 %);
+    # si la sílaba no tiene vocal o consonante, el resto se reparte igual
+    with np.errstate(divide="ignore", invalid="ignore"):
+        vowel_share = np.where(consonant_counts > 0, 0.8, 1.0) / vowel_counts
+        consonant_share = np.where(vowel_counts > 0, 0.2, 1.0) / consonant_counts
 
-        else:
+    durations = note_durations * np.where(is_vowel, vowel_share, consonant_share)
 
-            # consonantes cortas, vocal larga
-            consonant_time = duration * 0.2
-            vowel_time = duration * 0.8
+    # inicio de cada fonema dentro de su sílaba
+    cumulative = np.cumsum(durations) - durations
+    first_of_syllable = np.repeat(np.cumsum(counts) - counts, counts)
 
-            per_consonant = consonant_time / (len(phonemes) - 1)
+    starts = (
+        LAB_SILENCE_START
+        + score.starts[syllable_idx]
+        + cumulative
+        - cumulative[first_of_syllable]
+    )
 
-            for p in phonemes:
+    # ------------------------------------------------------
+    # Tiempos en unidades HTS (100 ns)
+    # ------------------------------------------------------
+    # redondeo único de cada frontera: el fin de un fonema y el
+    # inicio del siguiente salen del mismo valor
+    start_units = _hts_units(starts).tolist()
 
-                if p in vowels:
-                    d = vowel_time
-                else:
-                    d = per_consonant
+    note_end_units = _hts_units(LAB_SILENCE_START + score.ends).tolist()
+    note_start_units = _hts_units(LAB_SILENCE_START + score.starts).tolist()
 
-                start = int(time * 10_000_000)
-                end = int((time + d) * 10_000_000)
-
-                lines.append(f"{start} {end} {p}")
+    lines = []
 
-                time += d
+    first_start = note_start_units[0] if note_start_units else _hts_units(LAB_SILENCE_START)
 
-    # silencio final
-    sil = 0.3
-    start = int(time * 10_000_000)
-    end = int((time + sil) * 10_000_000)
-
-    lines.append(f"{start} {end} sil")
+    # silencio inicial
+    lines.append(f"0 {first_start} sil")
+    current = first_start
 
-    output_path.parent.mkdir(parents=True, exist_ok=True)
+    phoneme = 0
 
-    with open(output_path, "w", encoding="utf-8") as f:
-        f.write("\n".join(lines))
+    for i, count in enumerate(counts.tolist()):
 
+        if count == 0:
+            continue
 
-# ==========================================================
-# Generar curva de pitch (F0)
-# ==========================================================
-def generate_f0_from_score(score, output_path, frame_rate=100):
+        # silencio entre notas (pausas de la partitura)
+        if start_units[phoneme] > current:
+            lines.append(f"{current} {start_units[phoneme]} pau")
+            current = start_units[phoneme]
 
-    f0 = []
+        last = phoneme + count - 1
 
-    for item in score:
+        # cada fonema empieza donde acaba el anterior y acaba donde
+        # empieza el siguiente; el último, con la nota
+        for j in range(phoneme, last + 1):
 
-        pitch = item["pitch"]
-        duration = item["duration"]
+            end = start_units[j + 1] if j < last else note_end_units[i]
+            end = max(end, current)
 
-        # número de frames
-        frames = int(duration * frame_rate)
+            lines.append(f"{current} {end} {labels[j]}")
+            current = end
 
-        if pitch is None:
-            pitch = 0
+        phoneme = last + 1
 
-        for _ in range(frames):
-            f0.append(pitch)
+    # silencio final
+    lines.append(f"{current} {current + _hts_units(LAB_SILENCE_END)} sil")
 
     output_path.parent.mkdir(parents=True, exist_ok=True)
 
     with open(output_path, "w", encoding="utf-8") as f:
-        for value in f0:
-            f.write(f"{value}\n")
\ No newline at end of file
+        f.write("\n".join(lines))
+
+
+# ==========================================================
+# Generar curva de pitch (F0)
+# ==========================================================
+def generate_f0_from_score(
+    score: AlignedVoice,
+    output_path,
+    frame_rate=F0_FRAME_RATE,
+    unit: str = "midi",
+    fmt: str | None = None,
+):
+    """
+    Genera la curva de F0 de la voz y la guarda en output_path.
+
+    El formato (texto, .npy o float32 crudo) se deduce de la extensión
+    si no se indica fmt. Devuelve la curva generada.
+    """
+
+    # mismos tiempos que el .lab, silencios incluidos
+    starts = LAB_SILENCE_START + score.starts
+    durations = score.ends - score.starts
+
+    last_end = float(score.ends.max()) if len(score) else 0.0
+    total = LAB_SILENCE_START + last_end + LAB_SILENCE_END
+
+    contour = build_f0_contour(
+        starts,
+        durations,
+        score.notes.pitch,
+        frame_rate=frame_rate,
+        total_duration=total,
+        portamento=F0_PORTAMENTO_SECONDS,
+        vibrato_depth=F0_VIBRATO_DEPTH,
+        vibrato_rate=F0_VIBRATO_RATE,
+        vibrato_delay=F0_VIBRATO_DELAY,
+        unit=unit,
+    )
+
+    write_f0(contour, output_path, fmt=fmt)
+
+    return contour
@@ -0,0 +1,172 @@
+"""
+Reparto del IPA de una palabra entre sus sílabas.
+
+eSpeak pronuncia mucho mejor la palabra completa ("gloria") que sus
+sílabas sueltas ("glo", "ri", "a"). Este servicio toma el IPA de la
+palabra y lo divide entre las sílabas de la partitura:
+
+IPA de la palabra
+  ↓
+segmentos (fonema + diacríticos, africadas unidas)
+  ↓
+núcleos vocálicos (uno por sílaba)
+  ↓
+consonantes entre núcleos → ataque de la sílaba siguiente
+según las consonantes escritas en la sílaba
+
+Si el número de núcleos no coincide con el de sílabas se devuelve
+None y quien llama convierte esas sílabas por separado.
+"""
+
+import unicodedata
+
+# Vocales IPA (incluidas las que produce eSpeak)
+IPA_VOWELS = set("aeiouyæøœɶɑɒɐəɘɵɛɜɞɪʏʊɔʌɤɯɨʉɚɝᵻ")
+
+# Marcas que modifican al segmento anterior
+IPA_MODIFIERS = set("ːˑʰʲʷˠˤ̩̯̥̬̪̃͡")
+
+# Marcas de acento y de separación que no forman parte de ningún segmento
+IPA_IGNORED = set("ˈˌ.‿ -")
+
+# Africadas que se escriben con dos símbolos pero son un solo fonema
+IPA_AFFRICATES = ("tʃ", "dʒ", "ts", "dz", "tɕ", "dʑ", "ʈʂ", "ɖʐ", "pf")
+
+# Vocales ortográficas
+LETTER_VOWELS = set("aeiouyáéíóúàèìòùâêîôûäëïöüýÿæœåø")
+
+# Grafías de varias letras que suenan como una sola consonante
+LETTER_DIGRAPHS = ("tsch", "sch", "ch", "ll", "rr", "sh", "th", "ph", "gn", "ny", "tx", "tz", "ts", "ck")
+
+
+# ==========================================================
+# Segmentación
+# ==========================================================
+def split_ipa_segments(ipa: str) -> list[str]:
+    """
+    Divide una cadena IPA en segmentos: cada símbolo base con sus
+    diacríticos, y las africadas como un único segmento.
+    """
+
+    segments = []
+
+    i = 0
+    while i < len(ipa):
+
+        char = ipa[i]
+
+        if char in IPA_IGNORED or char.isspace():
+            i += 1
+            continue
+
+        if char in IPA_MODIFIERS or unicodedata.combining(char):
+            if segments:
+                segments[-1] += char
+            i += 1
+            continue
+
+        affricate = next((a for a in IPA_AFFRICATES if ipa.startswith(a, i)), None)
+
+        if affricate:
+            segments.append(affricate)
+            i += len(affricate)
+            continue
+
+        segments.append(char)
+        i += 1
+
+    return segments
+
+
+def _is_nucleus(segment: str) -> bool:
+    # una vocal con ̯ es una semivocal, no un núcleo
+    return segment[0] in IPA_VOWELS and "̯" not in segment
+
+
+def _written_onset(syllable: str) -> int:
+    """
+    Número de consonantes (contando dígrafos como una) antes
+    de la primera vocal escrita de la sílaba.
+    """
+
+    letters = "".join(c for c in syllable.lower() if c.isalpha())
+
+    count = 0
+
+    i = 0
+    while i < len(letters) and letters[i] not in LETTER_VOWELS:
+
+        digraph = next((d for d in LETTER_DIGRAPHS if letters.startswith(d, i)), None)
+
+        i += len(digraph) if digraph else 1
+        count += 1
+
+    return count
+
+
+def _find_nuclei(segments: list[str], merge: bool) -> list[list[int]]:
+    """
+    Rangos [inicio, fin) de los núcleos vocálicos. Con merge=True
+    las vocales consecutivas (diptongos) forman un solo núcleo.
+    """
+
+    nuclei = []
+
+    for i, segment in enumerate(segments):
+
+        if not _is_nucleus(segment):
+            continue
+
+        if merge and nuclei and nuclei[-1][1] == i:
+            nuclei[-1][1] = i + 1
+        else:
+            nuclei.append([i, i + 1])
+
+    return nuclei
+
+
+# ==========================================================
+# Alineación
+# ==========================================================
+def align_word_ipa(syllables: list[str], ipa: str) -> list[str] | None:
+    """
+    Reparte el IPA de una palabra entre sus sílabas.
+
+    Devuelve una cadena IPA por sílaba, o None si no se puede
+    alinear de forma fiable.
+    """
+
+    if len(syllables) == 1:
+        return ["".join(split_ipa_segments(ipa))]
+
+    segments = split_ipa_segments(ipa)
+
+    nuclei = _find_nuclei(segments, merge=True)
+
+    # hiato ("ɔrɪa"): si agrupando las vocales faltan núcleos,
+    # se prueba con cada vocal como núcleo propio
+    if len(nuclei) < len(syllables):
+        nuclei = _find_nuclei(segments, merge=False)
+
+    if len(nuclei) != len(syllables):
+        return None
+
+    # fronteras: cada sílaba empieza en su ataque, tomado del final
+    # de las consonantes que separan su núcleo del anterior
+    bounds = [0]
+
+    for k in range(1, len(syllables)):
+
+        cluster_start = nuclei[k - 1][1]
+        cluster_end = nuclei[k][0]
+
+        onset = min(_written_onset(syllables[k]), cluster_end - cluster_start)
+
+        bounds.append(cluster_end - onset)
+
+    bounds.append(len(segments))
+
+    return [
+        "".join(segments[bounds[k]:bounds[k + 1]])
+        for k in range(len(syllables))
+    ]
@@ -3,6 +3,7 @@ from tkinter import ttk
 
 from services.coral_parser_service import extract_syllables_by_part
 from services.coral_parser_service import create_new_xml_with_lyrics
+from views.virtual_grid import EntryGrid
 
 from tkinter import filedialog
 from tkinter import messagebox
@@ -46,60 +47,24 @@ def open_lyrics_editor(parent, xml_path, xml_path_var, log):
         for part, sylls in syllables_by_part.items()
     }
 
-    entries_by_part = {}
+    grids_by_part = {}
 
     for part_name, syllables in syllables_by_part.items():
-        
-        entries_by_part[part_name] = []
 
         # Crear pestaña
         tab = ttk.Frame(notebook)
         notebook.add(tab, text=part_name)
 
-        canvas = tk.Canvas(tab)
-        canvas.configure(highlightthickness=0)
-
-        scrollbar = ttk.Scrollbar(tab, orient="vertical", command=canvas.yview)
-        scroll_frame = ttk.Frame(canvas)
-
-        scroll_frame.bind(
-            "<Configure>",
-            lambda e, c=canvas: c.configure(scrollregion=c.bbox("all"))
-        )
-
-        canvas.create_window((0,0), window=scroll_frame, anchor="nw")
-        canvas.configure(yscrollcommand=scrollbar.set)
-
-        canvas.pack(side="left", fill="both", expand=True)
-        scrollbar.pack(side="right", fill="y")
-
         # ===============================
-        # Frame de sílabas
+        # Rejilla de sílabas
         # ===============================
+        # Solo existen los Entry de las filas visibles: se reciclan
+        # al desplazarse (ver views/virtual_grid.py)
 
-        part_frame = ttk.Frame(scroll_frame, padding=10)
-        part_frame.pack(fill="x", pady=10)
-
-        syllables_per_row = 12
-        row = None
-
-        for i, syl in enumerate(syllables):
+        grid = EntryGrid(tab, syllables, columns=12)
+        grid.pack(fill="both", expand=True)
 
-            if i % syllables_per_row == 0:
-                row = ttk.Frame(part_frame)
-                row.pack(anchor="w", pady=2)
-
-            entry = ttk.Entry(
-                row,
-                width=max(len(syl) + 1, 3),
-                justify="center"
-            )
-
-            entry.insert(0, syl)
-
-            entry.pack(side="left", padx=2)
-
-            entries_by_part[part_name].append(entry)
+        grids_by_part[part_name] = grid
 
 
     def save_lyrics():
@@ -123,14 +88,11 @@ def open_lyrics_editor(parent, xml_path, xml_path_var, log):
             editor.focus_force()
             return
 
-        for part_name, entries in entries_by_part.items():
+        for part_name, grid in grids_by_part.items():
 
-            syllables = []
-
-            for entry in entries:
-                syllables.append(entry.get().strip())
-
-            updated_lyrics[part_name] = syllables
+            updated_lyrics[part_name] = [
+                text.strip() for text in grid.values
+            ]
 
         create_new_xml_with_lyrics(xml_path, file_path, updated_lyrics, log)
 
@@ -149,13 +111,8 @@ def open_lyrics_editor(parent, xml_path, xml_path_var, log):
     
     def revert_changes():
 
-        for part_name, entries in entries_by_part.items():
-
-            original = original_syllables[part_name]
-
-            for entry, text in zip(entries, original):
-                entry.delete(0, tk.END)
-                entry.insert(0, text)
+        for part_name, grid in grids_by_part.items():
+            grid.set_values(original_syllables[part_name])
 
         log("Cambios revertidos.")
             
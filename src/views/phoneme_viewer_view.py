@@ -1,9 +1,15 @@
+import queue
+import threading
 import tkinter as tk
 from tkinter import ttk
 from pathlib import Path
 
 #from services.coral_parser_service import extract_phonemes_by_part
-from services.phoneme_service import extract_phonemes_by_part
+from services.phoneme_service import iter_phonemes_by_part
+from views.virtual_grid import TextGrid
+
+# Intervalo (ms) con el que la ventana recoge resultados del hilo
+POLL_MS = 50
 
 def open_phoneme_viewer(parent, xml_path, language):
 
@@ -26,6 +32,35 @@ def open_phoneme_viewer(parent, xml_path, language):
         foreground="gray"
     ).pack(anchor="w", pady=(0,15))
 
+    # ===============================
+    # Progreso
+    # ===============================
+
+    progress_frame = ttk.Frame(main)
+    progress_frame.pack(fill="x", pady=(0,10))
+
+    progress = ttk.Progressbar(progress_frame, mode="indeterminate")
+    progress.pack(side="left", fill="x", expand=True)
+    progress.start(10)
+
+    status_var = tk.StringVar(value="Analizando partitura...")
+
+    ttk.Label(
+        progress_frame,
+        textvariable=status_var,
+        foreground="gray",
+        width=28
+    ).pack(side="left", padx=10)
+
+    cancel_event = threading.Event()
+
+    cancel_btn = ttk.Button(
+        progress_frame,
+        text="Cancelar",
+        command=cancel_event.set
+    )
+    cancel_btn.pack(side="left")
+
     # ===============================
     # Pestañas por voz
     # ===============================
@@ -33,87 +68,131 @@ def open_phoneme_viewer(parent, xml_path, language):
     notebook = ttk.Notebook(main)
     notebook.pack(fill="both", expand=True)
 
-    try:
-        phonemes_by_part = extract_phonemes_by_part(xml_path, language)
-    except Exception as e:
-        ttk.Label(
-            main,
-            text=f"Error generando fonética:\n{e}",
-            foreground="red"
-        ).pack()
-        return
+    # ===============================
+    # Botón cerrar
+    # ===============================
 
-    for part_name, pairs in phonemes_by_part.items():
+    def close():
+        cancel_event.set()
+        viewer.destroy()
 
-        tab = ttk.Frame(notebook)
-        notebook.add(tab, text=part_name)
+    ttk.Button(
+        main,
+        text="Cerrar",
+        command=close
+    ).pack(pady=10)
 
-        canvas = tk.Canvas(tab)
-        canvas.configure(highlightthickness=0)
+    viewer.protocol("WM_DELETE_WINDOW", close)
 
-        scrollbar = ttk.Scrollbar(tab, orient="vertical", command=canvas.yview)
-        scroll_frame = ttk.Frame(canvas)
+    # ===============================
+    # Conversión en segundo plano
+    # ===============================
 
-        scroll_frame.bind(
-            "<Configure>",
-            lambda e, c=canvas: c.configure(scrollregion=c.bbox("all"))
-        )
+    results = queue.Queue()
 
-        canvas.create_window((0, 0), window=scroll_frame, anchor="nw")
-        canvas.configure(yscrollcommand=scrollbar.set)
+    def worker():
+        try:
+            for message in iter_phonemes_by_part(
+                Path(xml_path),
+                language,
+                cancel_event=cancel_event
+            ):
+                results.put(("chunk", message))
 
-        canvas.pack(side="left", fill="both", expand=True)
-        scrollbar.pack(side="right", fill="y")
+            results.put(("end", None))
 
-        # ===============================
-        # Contenido fonético
-        # ===============================
+        except Exception as e:
+            results.put(("error", e))
 
-        part_frame = ttk.Frame(scroll_frame, padding=10)
-        part_frame.pack(fill="x", pady=10)
+    threading.Thread(target=worker, daemon=True).start()
 
-        per_row = 8
-        row = None
+    tabs = {}
 
-        for i, item in enumerate(pairs):
+    def finish(text):
+        progress.stop()
+        cancel_btn.config(state="disabled")
+        status_var.set(text)
 
-            syl = item["syllable"]
-            tokens = item["phonemes"]
+    def poll():
 
-            #phon = " ".join(tokens)   # ← mostramos tokens separados
-            phon = " ".join(tokens).replace("ˈ", "").replace("ˌ", "")
-            if not tokens:
-                phon = "-"
-            else:
-                phon = " ".join(tokens)
+        if not viewer.winfo_exists():
+            return
 
-            if i % per_row == 0:
-                row = ttk.Frame(part_frame)
-                row.pack(anchor="w", pady=5)
+        while True:
 
-            cell = ttk.Frame(row)
-            cell.pack(side="left", padx=5)
+            try:
+                kind, payload = results.get_nowait()
+            except queue.Empty:
+                break
 
-            # Sílabas (arriba)
-            ttk.Label(
-                cell,
-                text=syl,
-                font=("Segoe UI", 10, "bold")
-            ).pack()
+            if kind == "error":
+                finish("Error")
+                ttk.Label(
+                    main,
+                    text=f"Error generando fonética:\n{payload}",
+                    foreground="red"
+                ).pack()
+                return
 
-            # Fonética (abajo)
-            ttk.Label(
-                cell,
-                text=phon,
-                foreground="blue"
-            ).pack()    
+            if kind == "end":
+                if cancel_event.is_set():
+                    finish("Cancelado")
+                else:
+                    progress.config(value=progress["maximum"])
+                    finish("Completado")
+                return
 
-    # ===============================
-    # Botón cerrar
-    # ===============================
+            part_name, items, done, total = payload
 
-    ttk.Button(
-        main,
-        text="Cerrar",
-        command=viewer.destroy
-    ).pack(pady=10)
\ No newline at end of file
+            if str(progress["mode"]) == "indeterminate":
+                progress.stop()
+                progress.config(mode="determinate", maximum=max(total, 1), value=0)
+
+            if part_name not in tabs:
+                tabs[part_name] = _create_part_tab(notebook, part_name)
+
+            _add_cells(tabs[part_name], items)
+
+            progress.config(value=done)
+            status_var.set(f"{done} / {total} sílabas")
+
+        viewer.after(POLL_MS, poll)
+
+    viewer.after(POLL_MS, poll)
+
+
+# ===============================
+# Pestaña de una voz
+# ===============================
+
+def _create_part_tab(notebook, part_name):
+
+    tab = ttk.Frame(notebook)
+    notebook.add(tab, text=part_name)
+
+    # Solo se dibujan las filas visibles (ver views/virtual_grid.py)
+    grid = TextGrid(tab, columns=8)
+    grid.pack(fill="both", expand=True)
+
+    return grid
+
+
+def _add_cells(grid, items):
+    """
+    Añade al final de la pestaña las sílabas recién convertidas.
+    """
+
+    cells = []
+
+    for item in items:
+
+        tokens = item["phonemes"]
+
+        if not tokens:
+            phon = "-"
+        else:
+            phon = " ".join(tokens)
+
+        cells.append((item["syllable"], phon))
+
+    grid.append(cells)
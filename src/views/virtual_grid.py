@@ -0,0 +1,248 @@
+"""
+Rejillas virtualizadas para listas largas de sílabas.
+
+En lugar de crear uno o varios widgets por sílaba, solo se dibujan
+las filas visibles del canvas:
+
+- TextGrid  → dibuja el texto directamente en el canvas (visor de fonética)
+- EntryGrid → reutiliza un conjunto fijo de Entry que se reasignan
+              a las sílabas visibles al desplazarse (editor de letra)
+
+Así el tiempo de apertura y la memoria no crecen con la longitud
+de la partitura.
+"""
+
+import math
+import tkinter as tk
+from tkinter import ttk
+
+
+class VirtualGrid(ttk.Frame):
+    """
+    Base: canvas con scroll cuyo alto corresponde a todas las filas,
+    aunque solo se construyen las visibles.
+    """
+
+    def __init__(self, parent, columns: int, cell_width: int, row_height: int, padding: int = 10):
+        super().__init__(parent)
+
+        self.columns = columns
+        self.cell_width = cell_width
+        self.row_height = row_height
+        self.padding = padding
+
+        self.canvas = tk.Canvas(self)
+        self.canvas.configure(highlightthickness=0, yscrollincrement=row_height)
+
+        scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.canvas.yview)
+
+        # cada cambio de la vista (scrollbar, rueda, tamaño) llega aquí
+        def on_view_change(first, last):
+            scrollbar.set(first, last)
+            self.refresh()
+
+        self.canvas.configure(yscrollcommand=on_view_change)
+
+        self.canvas.pack(side="left", fill="both", expand=True)
+        scrollbar.pack(side="right", fill="y")
+
+        self.canvas.bind("<Configure>", lambda e: self.refresh())
+
+        self.bind_wheel(self.canvas)
+
+        self._count = 0
+        self._visible = None
+
+    # ------------------------------------------------------
+    # Datos
+    # ------------------------------------------------------
+    def set_count(self, count: int):
+        """
+        Número total de celdas; recalcula la zona desplazable.
+        """
+
+        self._count = count
+
+        rows = math.ceil(count / self.columns)
+
+        self.canvas.configure(scrollregion=(
+            0,
+            0,
+            self.columns * self.cell_width + 2 * self.padding,
+            rows * self.row_height + 2 * self.padding,
+        ))
+
+        self._visible = None
+        self.refresh()
+
+    # ------------------------------------------------------
+    # Dibujo
+    # ------------------------------------------------------
+    def refresh(self):
+
+        top = self.canvas.canvasy(0)
+        height = self.canvas.winfo_height()
+
+        rows = math.ceil(self._count / self.columns)
+
+        first = max(0, int((top - self.padding) // self.row_height))
+        last = min(rows, int((top + height - self.padding) // self.row_height) + 1)
+
+        if (first, last) == self._visible:
+            return
+
+        self._visible = (first, last)
+
+        start = first * self.columns
+        end = min(last * self.columns, self._count)
+
+        self.render(start, max(start, end))
+
+    def render(self, start: int, end: int):
+        """
+        Construye las celdas start..end-1 (las visibles).
+        """
+        raise NotImplementedError
+
+    def cell_origin(self, index: int) -> tuple[int, int]:
+
+        row, col = divmod(index, self.columns)
+
+        return (
+            self.padding + col * self.cell_width,
+            self.padding + row * self.row_height,
+        )
+
+    def bind_wheel(self, widget):
+
+        widget.bind("<MouseWheel>", self._on_wheel)
+
+        # Linux
+        widget.bind("<Button-4>", lambda e: self.canvas.yview_scroll(-1, "units"))
+        widget.bind("<Button-5>", lambda e: self.canvas.yview_scroll(1, "units"))
+
+    def _on_wheel(self, event):
+        self.canvas.yview_scroll(-1 if event.delta > 0 else 1, "units")
+
+
+# ==========================================================
+# Texto dibujado en el canvas
+# ==========================================================
+class TextGrid(VirtualGrid):
+    """
+    Celdas de dos líneas (texto arriba en negrita, texto abajo en azul)
+    dibujadas como elementos de texto del canvas.
+    """
+
+    def __init__(self, parent, columns: int = 8, cell_width: int = 100, row_height: int = 48):
+        super().__init__(parent, columns, cell_width, row_height)
+
+        self.items = []
+
+    def append(self, items: list[tuple[str, str]]):
+        self.items.extend(items)
+        self.set_count(len(self.items))
+
+    def render(self, start: int, end: int):
+
+        self.canvas.delete("cell")
+
+        for index in range(start, end):
+
+            top, bottom = self.items[index]
+
+            x, y = self.cell_origin(index)
+            x += self.cell_width // 2
+
+            # Sílabas (arriba)
+            self.canvas.create_text(
+                x, y,
+                text=top,
+                anchor="n",
+                font=("Segoe UI", 10, "bold"),
+                width=self.cell_width - 6,
+                tags="cell"
+            )
+
+            # Fonética (abajo)
+            self.canvas.create_text(
+                x, y + 20,
+                text=bottom,
+                anchor="n",
+                fill="blue",
+                width=self.cell_width - 6,
+                tags="cell"
+            )
+
+
+# ==========================================================
+# Entradas editables recicladas
+# ==========================================================
+class EntryGrid(VirtualGrid):
+    """
+    Celdas editables. Los valores viven en self.values; los Entry
+    visibles se enlazan a ellos y se reasignan al desplazarse.
+    """
+
+    def __init__(self, parent, values: list[str], columns: int = 12, cell_width: int = 64, row_height: int = 30):
+        super().__init__(parent, columns, cell_width, row_height)
+
+        self.values = list(values)
+
+        # cada elemento: [Entry, StringVar, id de ventana, índice enlazado]
+        self._pool = []
+
+        self.set_count(len(self.values))
+
+    def set_values(self, values: list[str]):
+        self.values = list(values)
+        self.set_count(len(self.values))
+
+    def render(self, start: int, end: int):
+
+        needed = end - start
+
+        while len(self._pool) < needed:
+            self._pool.append(self._create_slot())
+
+        for offset, slot in enumerate(self._pool):
+
+            entry, var, window, _ = slot
+            index = start + offset
+
+            if index >= end:
+                slot[3] = None
+                self.canvas.itemconfigure(window, state="hidden")
+                continue
+
+            # enlazar primero: la traza de var escribe en values[slot[3]]
+            slot[3] = index
+            var.set(self.values[index])
+
+            self.canvas.coords(window, *self.cell_origin(index))
+            self.canvas.itemconfigure(window, state="normal")
+
+    def _create_slot(self):
+
+        var = tk.StringVar()
+
+        entry = ttk.Entry(
+            self.canvas,
+            textvariable=var,
+            width=max(self.cell_width // 9, 3),
+            justify="center"
+        )
+
+        window = self.canvas.create_window(0, 0, window=entry, anchor="nw", state="hidden")
+
+        slot = [entry, var, window, None]
+
+        def on_write(*_):
+            if slot[3] is not None:
+                self.values[slot[3]] = var.get()
+
+        var.trace_add("write", on_write)
+
+        self.bind_wheel(entry)
+
+        return slot